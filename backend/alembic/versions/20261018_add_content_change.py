@@ -0,0 +1,36 @@
+"""add_content_change
+
+Revision ID: 20261018_add_content_change
+Revises: 20261018_add_media_asset
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_add_content_change"
+down_revision = "20261018_add_media_asset"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "contentchange",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.String(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False),
+        sa.Column("previous_slug", sa.String(), nullable=True),
+        sa.Column("changed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_contentchange_entity", "contentchange", ["entity"])
+    op.create_index("ix_contentchange_changed_at", "contentchange", ["changed_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_contentchange_changed_at", table_name="contentchange")
+    op.drop_index("ix_contentchange_entity", table_name="contentchange")
+    op.drop_table("contentchange")
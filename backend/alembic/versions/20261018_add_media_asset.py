@@ -0,0 +1,35 @@
+"""add_media_asset
+
+Revision ID: 20261018_add_media_asset
+Revises: 20261018_add_revalidation_job
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_add_media_asset"
+down_revision = "20261018_add_revalidation_job"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "mediaasset",
+        sa.Column("sha256", sa.String(), nullable=False),
+        sa.Column("url", sa.String(), nullable=False),
+        sa.Column("content_type", sa.String(), nullable=False),
+        sa.Column("size_bytes", sa.Integer(), nullable=False),
+        sa.Column("gc_reference_count", sa.Integer(), nullable=False),
+        sa.Column("last_referenced_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("sha256"),
+    )
+    op.create_index("ix_mediaasset_url", "mediaasset", ["url"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_mediaasset_url", table_name="mediaasset")
+    op.drop_table("mediaasset")
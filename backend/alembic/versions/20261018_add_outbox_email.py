@@ -0,0 +1,45 @@
+"""add_outbox_email
+
+Revision ID: 20261018_add_outbox_email
+Revises: 20261018_article_scheduled_index
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261018_add_outbox_email"
+down_revision = "20261018_article_scheduled_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    outbox_status = sa.Enum("PENDING", "FAILED", name="outboxstatus")
+    op.create_table(
+        "outboxemail",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("html", sa.String(), nullable=False),
+        sa.Column("digest_key", sa.String(), nullable=True),
+        sa.Column("status", outbox_status, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_outboxemail_digest_key", "outboxemail", ["digest_key"])
+    op.create_index("ix_outboxemail_status", "outboxemail", ["status"])
+    op.create_index("ix_outboxemail_next_attempt_at", "outboxemail", ["next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outboxemail_next_attempt_at", table_name="outboxemail")
+    op.drop_index("ix_outboxemail_status", table_name="outboxemail")
+    op.drop_index("ix_outboxemail_digest_key", table_name="outboxemail")
+    op.drop_table("outboxemail")
+    sa.Enum(name="outboxstatus").drop(op.get_bind(), checkfirst=True)
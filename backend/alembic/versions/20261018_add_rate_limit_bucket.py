@@ -0,0 +1,29 @@
+"""add_rate_limit_bucket
+
+Revision ID: 20261018_add_rate_limit_bucket
+Revises: 20261018_article_tags_jsonb
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_add_rate_limit_bucket"
+down_revision = "20261018_article_tags_jsonb"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ratelimitbucket",
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("window_index", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("key", "window_index"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("ratelimitbucket")
@@ -0,0 +1,46 @@
+"""add_revalidation_job
+
+Revision ID: 20261018_add_revalidation_job
+Revises: 20261018_add_rate_limit_bucket
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261018_add_revalidation_job"
+down_revision = "20261018_add_rate_limit_bucket"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    revalidation_status = sa.Enum("PENDING", "FAILED", name="revalidationstatus")
+    op.create_table(
+        "revalidationjob",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("frontend_url", sa.String(), nullable=False),
+        sa.Column("paths", sa.JSON(), nullable=True),
+        sa.Column("status", revalidation_status, nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_revalidationjob_frontend_url", "revalidationjob", ["frontend_url"])
+    op.create_index("ix_revalidationjob_status", "revalidationjob", ["status"])
+    op.create_index("ix_revalidationjob_next_attempt_at", "revalidationjob", ["next_attempt_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_revalidationjob_next_attempt_at", table_name="revalidationjob")
+    op.drop_index("ix_revalidationjob_status", table_name="revalidationjob")
+    op.drop_index("ix_revalidationjob_frontend_url", table_name="revalidationjob")
+    op.drop_table("revalidationjob")
+    sa.Enum(name="revalidationstatus").drop(op.get_bind(), checkfirst=True)
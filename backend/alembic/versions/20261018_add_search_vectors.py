@@ -0,0 +1,51 @@
+"""add_search_vectors
+
+Revision ID: 20261018_add_search_vectors
+Revises: 20260224_extend_project_and_blogpost_for_agency
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "20261018_add_search_vectors"
+down_revision = "20260224_extend_project_and_blogpost_for_agency"
+branch_labels = None
+depends_on = None
+
+
+# Weights: A = title, B = short descriptive fields, C = JSON body text.
+# jsonb_to_tsvector(..., '["string"]') indexes every string value of the
+# JSON document (article sections, project problem/objectives/solution).
+ARTICLE_VECTOR = """
+    setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, coalesce(excerpt, '')), 'B') ||
+    setweight(jsonb_to_tsvector('simple'::regconfig, coalesce(content::jsonb, '{}'::jsonb), '["string"]'), 'C')
+"""
+
+PROJECT_VECTOR = """
+    setweight(to_tsvector('simple'::regconfig, coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, coalesce(client_name, '') || ' ' || coalesce(industry, '')), 'B') ||
+    setweight(jsonb_to_tsvector('simple'::regconfig, coalesce(description::jsonb, '{}'::jsonb), '["string"]'), 'C')
+"""
+
+
+def upgrade() -> None:
+    op.execute(
+        f"ALTER TABLE article ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({ARTICLE_VECTOR}) STORED"
+    )
+    op.execute("CREATE INDEX ix_article_search_vector ON article USING gin (search_vector)")
+
+    op.execute(
+        f"ALTER TABLE project ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({PROJECT_VECTOR}) STORED"
+    )
+    op.execute("CREATE INDEX ix_project_search_vector ON project USING gin (search_vector)")
+
+
+def downgrade() -> None:
+    op.drop_index("ix_project_search_vector", table_name="project")
+    op.drop_column("project", "search_vector")
+    op.drop_index("ix_article_search_vector", table_name="article")
+    op.drop_column("article", "search_vector")
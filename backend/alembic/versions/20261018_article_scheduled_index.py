@@ -0,0 +1,29 @@
+"""article_scheduled_index
+
+Revision ID: 20261018_article_scheduled_index
+Revises: 20261018_add_content_change
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_article_scheduled_index"
+down_revision = "20261018_add_content_change"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Partial: only the handful of scheduled rows are indexed
+    op.create_index(
+        "ix_article_scheduled_due",
+        "article",
+        ["status", "published_at"],
+        postgresql_where=sa.text("status = 'scheduled'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_article_scheduled_due", table_name="article")
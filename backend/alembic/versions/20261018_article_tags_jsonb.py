@@ -0,0 +1,61 @@
+"""article_tags_jsonb
+
+Revision ID: 20261018_article_tags_jsonb
+Revises: 20261018_add_search_vectors
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "20261018_article_tags_jsonb"
+down_revision = "20261018_add_search_vectors"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "article",
+        "tags",
+        type_=postgresql.JSONB(),
+        postgresql_using="tags::jsonb",
+    )
+    # jsonb_path_ops only supports @>, which is all tag filtering needs,
+    # and is smaller and faster than the default jsonb_ops.
+    op.create_index(
+        "ix_article_tags",
+        "article",
+        ["tags"],
+        postgresql_using="gin",
+        postgresql_ops={"tags": "jsonb_path_ops"},
+    )
+
+    op.create_table(
+        "articletagcount",
+        sa.Column("tag", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("tag"),
+    )
+    op.execute(
+        """
+        INSERT INTO articletagcount (tag, count)
+        SELECT tag, count(DISTINCT article.id)
+        FROM article, jsonb_array_elements_text(article.tags) AS tag
+        WHERE article.published AND NOT article.archived
+        GROUP BY tag
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("articletagcount")
+    op.drop_index("ix_article_tags", table_name="article")
+    op.alter_column(
+        "article",
+        "tags",
+        type_=sa.JSON(),
+        postgresql_using="tags::json",
+    )
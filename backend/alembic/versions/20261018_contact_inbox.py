@@ -0,0 +1,57 @@
+"""contact_inbox
+
+Revision ID: 20261018_contact_inbox
+Revises: 20261018_add_outbox_email
+Create Date: 2026-10-18 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "20261018_contact_inbox"
+down_revision = "20261018_add_outbox_email"
+branch_labels = None
+depends_on = None
+
+
+# Same weighting scheme as 20261018_add_search_vectors: A = subject,
+# B = company, C = message body.
+CONTACT_VECTOR = """
+    setweight(to_tsvector('simple'::regconfig, coalesce(subject, '')), 'A') ||
+    setweight(to_tsvector('simple'::regconfig, coalesce(company, '')), 'B') ||
+    setweight(to_tsvector('simple'::regconfig, coalesce(message, '')), 'C')
+"""
+
+
+def upgrade() -> None:
+    op.create_index("ix_contactmessage_status_created_at", "contactmessage", ["status", "created_at"])
+    op.create_index("ix_contactmessage_priority_created_at", "contactmessage", ["priority", "created_at"])
+    op.create_index("ix_contactmessage_created_at", "contactmessage", ["created_at"])
+
+    op.execute(
+        f"ALTER TABLE contactmessage ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS ({CONTACT_VECTOR}) STORED"
+    )
+    op.execute("CREATE INDEX ix_contactmessage_search_vector ON contactmessage USING gin (search_vector)")
+
+    op.create_table(
+        "contactcounter",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # Seed the counter; the ORM hook keeps it in sync from here on
+    op.execute(
+        "INSERT INTO contactcounter (name, value) "
+        "SELECT 'unread', count(*) FROM contactmessage WHERE status = 'NEW'"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("contactcounter")
+    op.drop_index("ix_contactmessage_search_vector", table_name="contactmessage")
+    op.drop_column("contactmessage", "search_vector")
+    op.drop_index("ix_contactmessage_created_at", table_name="contactmessage")
+    op.drop_index("ix_contactmessage_priority_created_at", table_name="contactmessage")
+    op.drop_index("ix_contactmessage_status_created_at", table_name="contactmessage")
@@ -1 +1 @@
-from . import auth, profile, projects, testimonials, media, articles, contact, social, settings
+from . import auth, profile, projects, testimonials, media, articles, contact, social, settings, metrics, public
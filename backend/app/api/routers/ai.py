@@ -1,15 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .auth import get_current_user
+from ...core.sse import sse_event, sse_response
+from ...models.database import get_async_session
 from ...models.portfolio import User
+from ...services.ai_service import get_ai_client
+from ...services.rate_limit_service import rate_limit
 
 router = APIRouter(prefix="/ai", tags=["AI Tools"])
 
+GENERATE_RATE_LIMIT_MAX_REQUESTS = 20
+GENERATE_RATE_LIMIT_WINDOW_SECONDS = 60
+
 class AIGenerateRequest(BaseModel):
     prompt: str
     context_type: str = "article" # article, section, excerpt
 
-@router.post("/generate")
+DRAFT_INSTRUCTIONS = {
+    "article": "Write a complete blog article draft for a B2B agency about the topic below: a title, a short excerpt, an introduction and 3 to 5 sections with headings. Use Markdown.",
+    "section": "Write one blog article section (a heading and 2 to 4 paragraphs) about the topic below. Use Markdown.",
+    "excerpt": "Write a 1 to 2 sentence excerpt for a blog article about the topic below.",
+}
+
+@router.post(
+    "/generate",
+    dependencies=[Depends(rate_limit("ai-generate", GENERATE_RATE_LIMIT_MAX_REQUESTS, GENERATE_RATE_LIMIT_WINDOW_SECONDS))],
+)
 async def generate_content(
     request: AIGenerateRequest,
     current_user: User = Depends(get_current_user)
@@ -61,3 +78,42 @@ async def generate_content(
             ]
         }
     }
+
+
+@router.post(
+    "/generate/stream",
+    dependencies=[Depends(rate_limit("ai-generate", GENERATE_RATE_LIMIT_MAX_REQUESTS, GENERATE_RATE_LIMIT_WINDOW_SECONDS))],
+)
+async def stream_content(
+    request: AIGenerateRequest,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Article drafting with the configured AI provider, streamed as
+    server-sent events: ``token`` {"text"} deltas, then ``done`` {"text"}
+    with the full draft, or ``error`` {"detail"} if the provider fails
+    mid-stream.
+    """
+    instructions = DRAFT_INSTRUCTIONS.get(request.context_type)
+    if instructions is None:
+        raise HTTPException(status_code=422, detail=f"Unknown context_type: {request.context_type}")
+    try:
+        ai = await get_ai_client(session)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    prompt = f"{instructions}\n\nTopic: {request.prompt}"
+
+    async def events():
+        parts = []
+        try:
+            async for delta in ai.stream_text(prompt):
+                parts.append(delta)
+                yield sse_event("token", {"text": delta})
+        except Exception as e:
+            yield sse_event("error", {"detail": f"{type(e).__name__}: {e}"})
+            return
+        yield sse_event("done", {"text": "".join(parts)})
+
+    return sse_response(events())
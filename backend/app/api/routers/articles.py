@@ -1,91 +1,220 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select, text
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlmodel import Session, col, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 import uuid
 
-from ...models.database import get_session
-from ...models.portfolio import Article, User
+from ...models.database import get_session, get_async_session
+from ...models.portfolio import Article, ArticleTagCount, User
 from ...schemas.portfolio import (
-    ArticleRead, ArticleCreate, ArticleUpdate
+    ArticleRead, ArticleCreate, ArticleUpdate, ArticleSearchResult, TagCount, ArticleBulkArchive, ArticleSummary
 )
 from .auth import get_current_user
+from ...core.pagination import keyset_paginate, MAX_PAGE_SIZE
+from ...core.fieldsets import column_options, parse_fields, sparse_rows
 from ...services.revalidation_service import trigger_revalidation
+from ...services.scheduler_service import schedule_publication
+from ...services.cache_service import cached_json, invalidate
+from ...services.search_service import ARTICLE_SEARCH, apply_search, run_search
+from ...services.tag_service import tag_filter
 
 router = APIRouter(prefix="/articles", tags=["Articles"])
 
-@router.get("", response_model=List[ArticleRead])
+_ARTICLE_LIST = TypeAdapter(List[ArticleRead])
+_ARTICLE = TypeAdapter(ArticleRead)
+_ARTICLE_SEARCH_RESULTS = TypeAdapter(List[ArticleSearchResult])
+_TAG_COUNTS = TypeAdapter(List[TagCount])
+_ARTICLE_SUMMARY_LIST = TypeAdapter(List[ArticleSummary])
+_SPARSE_LIST = TypeAdapter(List[Dict[str, Any]])
+
+@router.get(
+    "",
+    # view=summary and ?fields= return reduced shapes (sparse objects keep only the requested keys)
+    response_model=Union[List[ArticleRead], List[ArticleSummary], List[Dict[str, Any]]],
+)
 def get_articles(
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     published_only: bool = Query(False),
     published_filter: Optional[bool] = Query(None),
     search: Optional[str] = Query(None),
     tag: Optional[str] = Query(None),
+    tags: Optional[List[str]] = Query(None, description="Repeatable; combined with tag_mode"),
+    tag_mode: Literal["all", "any"] = Query("all", description="all = AND, any = OR"),
     archived: Optional[bool] = Query(None),
     agency_visible: Optional[bool] = Query(False, description="Filter by agency visibility"),
     status: Optional[str] = Query(None, description="Filter by status (draft|scheduled|published)"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (enables cursor pagination)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    view: Literal["full", "summary"] = Query("full", description="summary = listing fields only (ArticleSummary)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,slug,excerpt"),
 ):
-    statement = select(Article)
+    # Heavy JSON columns (content, seo, cta) are only selected when needed
+    requested = parse_fields(ArticleRead, fields)
+    names = list(ArticleSummary.model_fields) if requested is None and view == "summary" else requested
+
+    def render():
+        statement = select(Article)
+        if names is not None:
+            statement = statement.options(
+                column_options(Article, names, always=("published_at", "created_at"))
+            )
     
-    # Apply filters
-    if published_only:
-        statement = statement.where(Article.published == True)
-    elif published_filter is not None:
-        statement = statement.where(Article.published == published_filter)
+        # Apply filters
+        if published_only:
+            statement = statement.where(Article.published == True)
+        elif published_filter is not None:
+            statement = statement.where(Article.published == published_filter)
     
-    if archived is not None:
-        statement = statement.where(Article.archived == archived)
+        if archived is not None:
+            statement = statement.where(Article.archived == archived)
     
-    if search:
-        statement = statement.where(
-            (Article.title.ilike(f"%{search}%")) |
-            (Article.excerpt.ilike(f"%{search}%"))
-        )
+        if search:
+            statement = apply_search(session, statement, ARTICLE_SEARCH, search)
     
-    if tag:
-        statement = statement.where(text("tags::text LIKE :tag")).params(tag=f"%{tag}%")
+        wanted_tags = ([tag] if tag else []) + (tags or [])
+        if wanted_tags:
+            statement = statement.where(tag_filter(session, wanted_tags, match_all=tag_mode == "all"))
     
-    if agency_visible:
-        statement = statement.where(Article.agency_visible == True)
-        statement = statement.where(Article.status == "published")
-        statement = statement.order_by(Article.published_at.desc())
+        if agency_visible:
+            statement = statement.where(Article.agency_visible == True)
+            statement = statement.where(Article.status == "published")
+            statement = statement.order_by(Article.published_at.desc())
     
-    if status:
-        statement = statement.where(Article.status == status)
+        if status:
+            statement = statement.where(Article.status == status)
     
-    return session.exec(statement).all()
+        if limit or cursor:
+            # Drafts have no published_at yet: fall back to created_at so every row has a key
+            return keyset_paginate(
+                session, statement, response,
+                sort_key=func.coalesce(Article.published_at, Article.created_at),
+                id_column=Article.id,
+                limit=limit, cursor=cursor,
+                sort_value=lambda a: a.published_at or a.created_at,
+            )
+        return session.exec(statement).all()
+
+    if requested is not None:
+        return cached_json(
+            request, response, tags=["articles"], adapter=_SPARSE_LIST,
+            render=lambda: sparse_rows(render(), ArticleRead, requested),
+        )
+    adapter = _ARTICLE_SUMMARY_LIST if view == "summary" else _ARTICLE_LIST
+    return cached_json(request, response, tags=["articles"], adapter=adapter, render=render)
+
+@router.get("/tags", response_model=List[TagCount])
+def get_article_tags(
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+):
+    """Tags used by published articles with their article counts, most used first."""
+    def render():
+        return session.exec(
+            select(ArticleTagCount).order_by(col(ArticleTagCount.count).desc(), col(ArticleTagCount.tag))
+        ).all()
+
+    return cached_json(request, response, tags=["articles"], adapter=_TAG_COUNTS, render=render)
+
+@router.get("/search", response_model=List[ArticleSearchResult])
+def search_articles(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, description="Search terms (quotes, OR and -exclusion supported)"),
+    published_only: bool = Query(True),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session),
+):
+    """Full-text search over articles, ranked by relevance with highlighted snippets."""
+    def render():
+        statement = select(Article).where(Article.archived == False)
+        if published_only:
+            statement = statement.where(Article.published == True)
+        hits = run_search(session, statement, ARTICLE_SEARCH, q, limit)
+        return [
+            ArticleSearchResult.model_validate(
+                {**ArticleRead.model_validate(article).model_dump(), "rank": rank, "snippet": snippet}
+            )
+            for article, rank, snippet in hits
+        ]
+
+    return cached_json(request, response, tags=["articles"], adapter=_ARTICLE_SEARCH_RESULTS, render=render)
 
 @router.get("/{article_id}", response_model=ArticleRead)
-def get_article(article_id: uuid.UUID, session: Session = Depends(get_session)):
-    db_article = session.exec(select(Article).where(Article.id == article_id)).first()
-    if not db_article:
-        raise HTTPException(status_code=404, detail="Article not found")
-    return db_article
+def get_article(
+    article_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+):
+    def render():
+        db_article = session.exec(select(Article).where(Article.id == article_id)).first()
+        if not db_article:
+            raise HTTPException(status_code=404, detail="Article not found")
+        return db_article
+
+    return cached_json(request, response, tags=["articles"], adapter=_ARTICLE, render=render)
 
 @router.post("", response_model=ArticleRead)
 async def create_article(
     article: ArticleCreate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
     db_article = Article.model_validate(article)
     session.add(db_article)
-    session.commit()
-    session.refresh(db_article)
+    await session.commit()
+    await session.refresh(db_article)
+    schedule_publication(db_article)
     
     # Trigger revalidation
+    invalidate("articles")
     await trigger_revalidation(["/", "/blog", f"/blog/{db_article.slug}"])
     
     return db_article
 
+@router.post("/bulk-archive", response_model=List[ArticleRead])
+async def bulk_archive_articles(
+    payload: ArticleBulkArchive,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Archive (or restore with `archived: false`) several articles in one
+    transaction, with a single merged revalidation.
+    """
+    ids = list(dict.fromkeys(payload.ids))
+    articles = {
+        a.id: a
+        for a in (await session.exec(select(Article).where(col(Article.id).in_(ids)))).all()
+    }
+    missing = [str(i) for i in ids if i not in articles]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Articles not found: {', '.join(missing)}")
+
+    # Loaded and flushed through the ORM so the tag-count hook runs (once)
+    for db_article in articles.values():
+        db_article.archived = payload.archived
+        session.add(db_article)
+    await session.commit()
+
+    invalidate("articles")
+    await trigger_revalidation(["/", "/blog", *(f"/blog/{articles[i].slug}" for i in ids)])
+
+    return [articles[i] for i in ids]
+
 @router.patch("/{article_id}", response_model=ArticleRead)
 async def update_article(
     article_id: uuid.UUID, 
     article: ArticleUpdate, 
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    db_article = session.get(Article, article_id)
+    db_article = await session.get(Article, article_id)
     if not db_article:
         raise HTTPException(status_code=404, detail="Article not found")
     
@@ -94,10 +223,12 @@ async def update_article(
         setattr(db_article, key, value)
         
     session.add(db_article)
-    session.commit()
-    session.refresh(db_article)
+    await session.commit()
+    await session.refresh(db_article)
+    schedule_publication(db_article)
     
     # Trigger revalidation
+    invalidate("articles")
     await trigger_revalidation(["/", "/blog", f"/blog/{db_article.slug}"])
     
     return db_article
@@ -106,19 +237,20 @@ async def update_article(
 async def archive_article(
     article_id: uuid.UUID, 
     archived: bool = Query(...),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    db_article = session.get(Article, article_id)
+    db_article = await session.get(Article, article_id)
     if not db_article:
         raise HTTPException(status_code=404, detail="Article not found")
     
     db_article.archived = archived
     session.add(db_article)
-    session.commit()
-    session.refresh(db_article)
+    await session.commit()
+    await session.refresh(db_article)
     
     # Trigger revalidation
+    invalidate("articles")
     await trigger_revalidation(["/", "/blog", f"/blog/{db_article.slug}"])
     
     return db_article
@@ -134,4 +266,5 @@ def delete_article(
         raise HTTPException(status_code=404, detail="Article not found")
     session.delete(db_article)
     session.commit()
+    invalidate("articles")
     return {"ok": True}
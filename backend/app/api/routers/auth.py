@@ -1,18 +1,114 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlmodel import Session, select
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import get_history
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from jose import jwt, JWTError
 from typing import Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+import os
+import threading
+import time
 
-from ...models.database import get_session
+from ...models.database import get_async_session
 from ...models.portfolio import User
 from ...core.security import verify_password, create_access_token, SECRET_KEY, ALGORITHM
+from ...services.rate_limit_service import rate_limit
 
 router = APIRouter()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: Session = Depends(get_session)) -> User:
+# Brute-force protection for /login, per client IP
+LOGIN_RATE_LIMIT_MAX_REQUESTS = 10
+LOGIN_RATE_LIMIT_WINDOW_SECONDS = 60
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "1024"))
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """What routes need from the authenticated user, without the password hash."""
+    id: Optional[int]
+    username: str
+    full_name: Optional[str]
+    role: str
+
+    def to_user(self) -> User:
+        # A fresh detached instance per request, so handlers can't mutate the cached one
+        return User(id=self.id, username=self.username, full_name=self.full_name, role=self.role, hashed_password="")
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already-verified tokens -> user snapshot.
+
+    An entry lives for AUTH_CACHE_TTL_SECONDS at most and never past the
+    token's own ``exp``. Entries for a user are dropped as soon as that
+    user row is updated or deleted in this process (role or password
+    change); the TTL bounds staleness for writes made elsewhere.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, UserSnapshot]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        with self._lock:
+            item = self._entries.get(token)
+            if item is None:
+                return None
+            expires_at, snapshot = item
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return snapshot
+
+    def set(self, token: str, snapshot: UserSnapshot, token_exp: Optional[float]) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._entries[token] = (expires_at, snapshot)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, username: str) -> None:
+        with self._lock:
+            stale = [t for t, (_, snap) in self._entries.items() if snap.username == username]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: User) -> None:
+    # Cover renames too: drop the username the tokens were issued for
+    history = get_history(target, "username")
+    for username in {target.username, *(history.deleted or ())}:
+        token_cache.invalidate_user(username)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_async_session)) -> User:
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached.to_user()
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -26,10 +122,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme), session: Session
     except JWTError:
         raise credentials_exception
     
-    user = session.exec(select(User).where(User.username == username)).first()
+    user = (await session.exec(select(User).where(User.username == username))).first()
     if user is None:
         raise credentials_exception
-    return user
+
+    snapshot = UserSnapshot(id=user.id, username=user.username, full_name=user.full_name, role=user.role)
+    token_cache.set(token, snapshot, payload.get("exp"))
+    return snapshot.to_user()
 
 async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
     if current_user.role != "admin":
@@ -39,10 +138,14 @@ async def get_current_admin(current_user: User = Depends(get_current_user)) -> U
         )
     return current_user
 
-@router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
-    user = session.exec(select(User).where(User.username == form_data.username)).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+@router.post(
+    "/login",
+    dependencies=[Depends(rate_limit("login", LOGIN_RATE_LIMIT_MAX_REQUESTS, LOGIN_RATE_LIMIT_WINDOW_SECONDS))],
+)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_async_session)):
+    user = (await session.exec(select(User).where(User.username == form_data.username))).first()
+    # bcrypt is deliberately slow: keep it off the event loop
+    if not user or not await run_in_threadpool(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import List, Literal, Optional
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel import Session, col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ...models.database import get_session
+from ...core.pagination import keyset_paginate, MAX_PAGE_SIZE
+from ...models.database import get_session, get_async_session
+from ...models.events import UNREAD_COUNTER, count_unread
 from ...models.portfolio import (
+    ContactCounter,
     ContactMessage,
     ContactStatus,
     PriorityLevel,
@@ -15,7 +20,9 @@ from ...models.portfolio import (
 )
 from ...schemas.portfolio import ContactCreate, ContactRead, ContactAdminUpdate
 from .auth import get_current_admin
-from ...services.email_service import get_email_client
+from ...services.outbox_service import enqueue_email, notify_outbox
+from ...services.rate_limit_service import rate_limit
+from ...services.search_service import CONTACT_SEARCH, apply_search
 
 router = APIRouter(tags=["Contact"])
 
@@ -28,35 +35,35 @@ def _determine_priority(payload: ContactCreate) -> PriorityLevel:
     return PriorityLevel.LOW
 
 
-_RATE_LIMIT_BUCKET: dict[str, list[float]] = {}
-RATE_LIMIT_WINDOW_SECONDS = 60
-RATE_LIMIT_MAX_REQUESTS = 5
-
+def _notification_html(payload: ContactCreate) -> str:
+    budget_text = f"${payload.budget:,}" if payload.budget is not None else "N/A"
+    message_html = payload.message.replace("\n", "<br/>")
+    return f"""
+        <h1>New contact message</h1>
+        <p><strong>Name:</strong> {payload.name}</p>
+        <p><strong>Email:</strong> {payload.email}</p>
+        <p><strong>Phone:</strong> {payload.phone or "N/A"}</p>
+        <p><strong>Company:</strong> {payload.company or "N/A"}</p>
+        <p><strong>Service:</strong> {payload.service or "N/A"}</p>
+        <p><strong>Budget:</strong> {budget_text}</p>
+        <p><strong>Subject:</strong> {payload.subject}</p>
+        <p><strong>Message:</strong></p>
+        <p>{message_html}</p>
+        """
 
-def _rate_limited(ip: str) -> bool:
-    import time
 
-    now = time.time()
-    entries = _RATE_LIMIT_BUCKET.get(ip, [])
-    entries = [t for t in entries if now - t < RATE_LIMIT_WINDOW_SECONDS]
-    if len(entries) >= RATE_LIMIT_MAX_REQUESTS:
-        _RATE_LIMIT_BUCKET[ip] = entries
-        return True
-    entries.append(now)
-    _RATE_LIMIT_BUCKET[ip] = entries
-    return False
+RATE_LIMIT_WINDOW_SECONDS = 60
+RATE_LIMIT_MAX_REQUESTS = 5
 
 
-@router.post("/contact")
+@router.post(
+    "/contact",
+    dependencies=[Depends(rate_limit("contact", RATE_LIMIT_MAX_REQUESTS, RATE_LIMIT_WINDOW_SECONDS))],
+)
 async def create_contact(
     payload: ContactCreate,
-    request: Request,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    ip = request.client.host if request.client else "unknown"
-    if _rate_limited(ip):
-        raise HTTPException(status_code=429, detail="Too many requests")
-
     msg = ContactMessage(
         name=payload.name,
         email=payload.email,
@@ -70,47 +77,71 @@ async def create_contact(
         priority=_determine_priority(payload),
     )
     session.add(msg)
-    session.commit()
-    session.refresh(msg)
-
-    # fire-and-forget email notification
-    try:
-        email_client = await get_email_client(session)
-        budget_text = f"${payload.budget:,}" if payload.budget is not None else "N/A"
-        html = f"""
-        <h1>New contact message</h1>
-        <p><strong>Name:</strong> {payload.name}</p>
-        <p><strong>Email:</strong> {payload.email}</p>
-        <p><strong>Phone:</strong> {payload.phone or "N/A"}</p>
-        <p><strong>Company:</strong> {payload.company or "N/A"}</p>
-        <p><strong>Service:</strong> {payload.service or "N/A"}</p>
-        <p><strong>Budget:</strong> {budget_text}</p>
-        <p><strong>Subject:</strong> {payload.subject}</p>
-        <p><strong>Message:</strong></p>
-        <p>{payload.message.replace("\n", "<br/>")}</p>
-        """
-        await email_client.send_email(
-            to="",  # handled by email client default/notification setting
-            subject=f"New contact message: {payload.subject}",
-            html=html,
-        )
-    except Exception:
-        # Log only; don't block user on email failure
-        import logging
-
-        logging.exception("Failed to send contact notification email")
+    # Same transaction: the notification exists if and only if the message does
+    enqueue_email(
+        session,
+        subject=f"New contact message: {payload.subject}",
+        html=_notification_html(payload),
+        digest_key="contact",
+    )
+    await session.commit()
+    notify_outbox()
 
     return {"success": True, "id": str(msg.id)}
 
 
 @router.get("/admin/contact", response_model=list[ContactRead])
 def list_contact(
+    response: Response,
+    session: Session = Depends(get_session),
+    current_admin: User = Depends(get_current_admin),
+    status: Optional[List[ContactStatus]] = Query(None, description="Repeatable"),
+    priority: Optional[List[PriorityLevel]] = Query(None, description="Repeatable"),
+    service: Optional[str] = Query(None, description="Exact service, case-insensitive"),
+    created_from: Optional[datetime] = Query(None, description="Received at or after (UTC)"),
+    created_to: Optional[datetime] = Query(None, description="Received before (UTC)"),
+    q: Optional[str] = Query(None, min_length=1, description="Search in subject, company and message"),
+    sort: Literal["newest", "oldest", "updated"] = Query("newest"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (enables cursor pagination)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+):
+    stmt = select(ContactMessage)
+    if status:
+        stmt = stmt.where(col(ContactMessage.status).in_(status))
+    if priority:
+        stmt = stmt.where(col(ContactMessage.priority).in_(priority))
+    if service:
+        stmt = stmt.where(func.lower(ContactMessage.service) == service.lower())
+    if created_from:
+        stmt = stmt.where(ContactMessage.created_at >= created_from)
+    if created_to:
+        stmt = stmt.where(ContactMessage.created_at < created_to)
+    if q:
+        stmt = apply_search(session, stmt, CONTACT_SEARCH, q)
+
+    # (status|priority, created_at) indexes serve the filtered, date-ordered scans
+    sort_key = col(ContactMessage.updated_at) if sort == "updated" else col(ContactMessage.created_at)
+    if limit or cursor:
+        return keyset_paginate(
+            session, stmt, response,
+            sort_key=sort_key, id_column=ContactMessage.id,
+            limit=limit, cursor=cursor, ascending=sort == "oldest",
+        )
+    order = sort_key.asc() if sort == "oldest" else sort_key.desc()
+    return session.exec(stmt.order_by(None).order_by(order, col(ContactMessage.id))).all()
+
+
+@router.get("/admin/contact/unread-count")
+def get_unread_count(
     session: Session = Depends(get_session),
     current_admin: User = Depends(get_current_admin),
 ):
-    stmt = select(ContactMessage).order_by(ContactMessage.created_at.desc())
-    rows = session.exec(stmt).all()
-    return rows
+    """Read from the counter row kept in sync by the ORM hook, not a COUNT(*) scan."""
+    counter = session.get(ContactCounter, UNREAD_COUNTER)
+    if counter is None:
+        # No message written since the table was created
+        return {"unread": count_unread(session.connection())}
+    return {"unread": counter.value}
 
 
 @router.get("/admin/contact/{message_id}", response_model=ContactRead)
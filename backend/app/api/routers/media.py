@@ -1,10 +1,15 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Form
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Literal
 import os
-import uuid
-import shutil
 from .auth import get_current_user
+from ...models.database import get_async_session
 from ...models.portfolio import User
+from ...services.file_service import UploadTooLarge
+from ...services.media_service import store_upload
+from ...services import image_service
+from ...core.static_files import IMMUTABLE_CACHE_CONTROL, is_immutable_upload
 
 router = APIRouter(prefix="/media", tags=["Media"])
 
@@ -12,12 +17,16 @@ UPLOAD_DIR = "uploads"
 ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp", "image/gif", "image/svg+xml"}
 MAX_SIZE_MB = 5
 MAX_SIZE_BYTES = MAX_SIZE_MB * 1024 * 1024
+# Whole multipart body (file + framing + form fields), enforced before parsing
+MAX_UPLOAD_BODY_BYTES = MAX_SIZE_BYTES + 64 * 1024
 
-SUBFOLDERS = {
-    "testimonials": "testimonials",
-    "articles": "articles",
-    "projects": "projects",
-    "general": "",
+# One extension per type, so identical content always maps to the same URL
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/webp": ".webp",
+    "image/gif": ".gif",
+    "image/svg+xml": ".svg",
 }
 
 def _ensure_dir(path: str):
@@ -32,11 +41,15 @@ async def upload_file(
     file: UploadFile = File(...),
     folder: str = Form(default="general"),
     current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """
     Upload an image file and return its public URL.
 
-    - **folder**: optional subfolder — one of `testimonials`, `articles`, `projects`, `general`
+    Files are stored by content hash (`/uploads/cas/ab/cd/<sha256>.<ext>`):
+    uploading the same image twice returns the same, immutable URL.
+
+    - **folder**: kept for compatibility (`testimonials`, `articles`, `projects`, `general`); echoed back
     - Accepted types: JPEG, PNG, WebP, GIF, SVG
     - Max size: 5 MB
     """
@@ -47,36 +60,59 @@ async def upload_file(
             detail=f"Unsupported file type '{file.content_type}'. Allowed: JPEG, PNG, WebP, GIF, SVG.",
         )
 
-    # ── Read & validate size ────────────────────────────────────────────────
-    contents = await file.read()
-    if len(contents) > MAX_SIZE_BYTES:
+    # ── Stream into the content-addressed store ─────────────────────────────
+    ext = EXTENSIONS[file.content_type]
+    try:
+        stored = await store_upload(session, file, ext, MAX_SIZE_BYTES)
+    except UploadTooLarge:
         raise HTTPException(
             status_code=413,
             detail=f"File too large. Maximum allowed size is {MAX_SIZE_MB} MB.",
         )
-
-    # ── Resolve subfolder ───────────────────────────────────────────────────
-    subfolder = SUBFOLDERS.get(folder, "")
-    target_dir = os.path.join(UPLOAD_DIR, subfolder) if subfolder else UPLOAD_DIR
-    _ensure_dir(target_dir)
-
-    # ── Generate unique filename ────────────────────────────────────────────
-    ext = os.path.splitext(file.filename or "file")[1].lower() or ".bin"
-    unique_filename = f"{uuid.uuid4()}{ext}"
-    file_path = os.path.join(target_dir, unique_filename)
-
-    # ── Save to disk ────────────────────────────────────────────────────────
-    try:
-        with open(file_path, "wb") as buffer:
-            buffer.write(contents)
-    except Exception as e:
+    except OSError as e:
         raise HTTPException(status_code=500, detail=f"Could not save file: {str(e)}")
 
     # ── Return public URL ───────────────────────────────────────────────────
-    url_path = f"/uploads/{subfolder}/{unique_filename}" if subfolder else f"/uploads/{unique_filename}"
+    asset = stored.asset
     return {
-        "url": url_path,
-        "filename": unique_filename,
+        "url": asset.url,
+        "filename": os.path.basename(asset.url),
         "folder": folder,
-        "size_bytes": len(contents),
+        "size_bytes": asset.size_bytes,
+        "sha256": asset.sha256,
+        "deduplicated": stored.deduplicated,
+        # <picture> sources for resized AVIF/WebP variants (None for SVG/GIF)
+        "srcset": await image_service.build_srcset(asset.url, asset.content_type),
     }
+
+
+@router.get("/variants/w{width:int}.{fmt}/uploads/{path:path}")
+async def get_image_variant(width: int, fmt: str, path: str):
+    """
+    Resized / re-encoded copy of an uploaded image, e.g.
+    `/media/variants/w640.webp/uploads/cas/ab/cd/<sha>.png`.
+
+    Variants are rendered once in the image process pool and then served
+    from the disk cache, so this also works for images uploaded before the
+    pipeline existed. Widths snap to the configured ones.
+    """
+    source_url = f"/uploads/{path}"
+    if image_service.source_path(source_url) is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    if fmt not in image_service.supported_formats():
+        # No Pillow / codec: let the client fall back to the original
+        return RedirectResponse(source_url)
+
+    try:
+        variant = await image_service.ensure_variant(source_url, image_service.snap_width(width), fmt)
+    except Exception:
+        raise HTTPException(status_code=422, detail="Could not process image")
+    if variant is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    cache_control = IMMUTABLE_CACHE_CONTROL if is_immutable_upload(path) else "public, max-age=86400"
+    return FileResponse(
+        variant,
+        media_type=image_service.MIME_TYPES[fmt],
+        headers={"Cache-Control": cache_control},
+    )
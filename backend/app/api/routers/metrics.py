@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ...models.database import pool_metrics, async_pool_metrics, get_async_session
+from ...models.portfolio import User
+from ...services.revalidation_service import revalidation_metrics, revalidation_queue_stats
+from .auth import get_current_admin
+
+router = APIRouter(prefix="/admin/metrics", tags=["Metrics"])
+
+
+@router.get("/db")
+def get_db_metrics(_: User = Depends(get_current_admin)):
+    """
+    Admin-only: connection pool gauges and counters for the sync and async engines.
+    Wait times include opening a new connection when the pool had none idle.
+    """
+    return {
+        "sync": pool_metrics.snapshot(),
+        "async": async_pool_metrics.snapshot(),
+    }
+
+
+@router.get("/revalidation")
+async def get_revalidation_metrics(
+    _: User = Depends(get_current_admin),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Admin-only: revalidation queue depth (shared table) plus this worker's
+    delivery counters. Latency is measured from enqueue to successful POST.
+    """
+    return {
+        "queue": await revalidation_queue_stats(session),
+        "worker": revalidation_metrics.snapshot(),
+    }
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
 from sqlmodel import Session, select
 from typing import Optional
 
@@ -8,25 +9,34 @@ from ...schemas.portfolio import (
     ProfileRead, ProfileUpdate, ProfileCreate
 )
 from .auth import get_current_user
+from ...services.cache_service import cached_json, invalidate
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
 
+_PROFILE = TypeAdapter(ProfileRead)
+
 @router.get("", response_model=ProfileRead)
 def get_profile(
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     current_user: Optional[User] = Depends(get_current_user)
 ):
-    if not current_user:
-        # Public view defaults to the first profile found
-        profile = session.exec(select(Profile)).first()
+    def render():
+        if not current_user:
+            # Public view defaults to the first profile found
+            profile = session.exec(select(Profile)).first()
+            if not profile:
+                raise HTTPException(status_code=404, detail="No profiles found")
+            return profile
+
+        profile = session.exec(select(Profile).where(Profile.user_id == current_user.id)).first()
         if not profile:
-            raise HTTPException(status_code=404, detail="No profiles found")
+            raise HTTPException(status_code=404, detail="Profile not found for this user")
         return profile
 
-    profile = session.exec(select(Profile).where(Profile.user_id == current_user.id)).first()
-    if not profile:
-        raise HTTPException(status_code=404, detail="Profile not found for this user")
-    return profile
+    user_key = current_user.id if current_user else "public"
+    return cached_json(request, response, tags=["profile"], adapter=_PROFILE, render=render, key_extra=[user_key])
 
 @router.post("", response_model=ProfileRead)
 def create_profile(
@@ -42,6 +52,7 @@ def create_profile(
     session.add(db_profile)
     session.commit()
     session.refresh(db_profile)
+    invalidate("profile")
     return db_profile
 
 @router.patch("", response_model=ProfileRead)
@@ -61,4 +72,5 @@ def update_profile(
     session.add(db_profile)
     session.commit()
     session.refresh(db_profile)
+    invalidate("profile")
     return db_profile
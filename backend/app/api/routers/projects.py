@@ -1,18 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlmodel import Session, col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from collections import Counter
+from typing import Any, Dict, List, Literal, Optional, Union
 import uuid
 
-from ...models.database import get_session
+from ...models.database import get_session, get_async_session
 from ...models.portfolio import Project, User
 from ...schemas.portfolio import (
-    ProjectRead, ProjectCreate, ProjectUpdate
+    ProjectRead, ProjectCreate, ProjectUpdate, ProjectSearchResult, ProjectBulkUpdate, ProjectSummary
 )
 from .auth import get_current_user, get_current_admin
+from ...core.pagination import keyset_paginate, MAX_PAGE_SIZE
+from ...core.fieldsets import column_options, parse_fields, sparse_rows
 from ...services.revalidation_service import trigger_revalidation
+from ...services.cache_service import cached_json, invalidate
+from ...services.search_service import PROJECT_SEARCH, run_search, substring_filter
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 
+_PROJECT_LIST = TypeAdapter(List[ProjectRead])
+_PROJECT = TypeAdapter(ProjectRead)
+_PROJECT_SEARCH_RESULTS = TypeAdapter(List[ProjectSearchResult])
+_PROJECT_SUMMARY_LIST = TypeAdapter(List[ProjectSummary])
+_SPARSE_LIST = TypeAdapter(List[Dict[str, Any]])
+
 
 # ── 1. Routes Authentifiées (Doivent être AVANT les routes avec ID pour éviter les conflits) ──
 
@@ -33,11 +46,7 @@ def get_my_projects(
     if is_featured is not None:
         query = query.where(Project.is_featured == is_featured)
     if search:
-        query = query.where(
-            (Project.title.ilike(f"%{search}%")) |
-            (Project.client_name.ilike(f"%{search}%")) |
-            (Project.description["problem"].astext.ilike(f"%{search}%"))
-        )
+        query = substring_filter(query, PROJECT_SEARCH, search)
     
     return session.exec(query).all()
 
@@ -59,11 +68,7 @@ def get_all_projects_admin(
     if is_featured is not None:
         query = query.where(Project.is_featured == is_featured)
     if search:
-        query = query.where(
-            (Project.title.ilike(f"%{search}%")) |
-            (Project.client_name.ilike(f"%{search}%")) |
-            (Project.description["problem"].astext.ilike(f"%{search}%"))
-        )
+        query = substring_filter(query, PROJECT_SEARCH, search)
     
     return session.exec(query).all()
 
@@ -89,37 +94,105 @@ def check_slug(
 
 # ── 2. Routes Publiques ──────────────────────────────────────────────────────────
 
-@router.get("", response_model=List[ProjectRead])
+@router.get(
+    "",
+    # view=summary and ?fields= return reduced shapes (sparse objects keep only the requested keys)
+    response_model=Union[List[ProjectRead], List[ProjectSummary], List[Dict[str, Any]]],
+)
 def get_projects(
+    request: Request,
+    response: Response,
     featured: Optional[bool] = Query(None, description="Filter by featured status"),
     agency_visible: Optional[bool] = Query(False, description="Filter by agency visibility"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (enables cursor pagination)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    view: Literal["full", "summary"] = Query("full", description="summary = card fields only (ProjectSummary)"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. title,slug,mainImage"),
     session: Session = Depends(get_session),
 ):
-    query = select(Project)
-    if featured is not None:
-        query = query.where(Project.is_featured == featured)
-    if agency_visible:
-        query = query.where(Project.agency_visible == True)
-        query = query.order_by(Project.created_at.desc())
-    return session.exec(query).all()
+    # Heavy JSON columns are only selected when the response needs them
+    requested = parse_fields(ProjectRead, fields)
+    names = list(ProjectSummary.model_fields) if requested is None and view == "summary" else requested
+
+    def render():
+        query = select(Project)
+        if names is not None:
+            query = query.options(column_options(Project, names, always=("created_at",)))
+        if featured is not None:
+            query = query.where(Project.is_featured == featured)
+        if agency_visible:
+            query = query.where(Project.agency_visible == True)
+            query = query.order_by(Project.created_at.desc())
+        if limit or cursor:
+            return keyset_paginate(
+                session, query, response,
+                sort_key=Project.created_at, id_column=Project.id,
+                limit=limit, cursor=cursor,
+            )
+        return session.exec(query).all()
+
+    if requested is not None:
+        return cached_json(
+            request, response, tags=["projects"], adapter=_SPARSE_LIST,
+            render=lambda: sparse_rows(render(), ProjectRead, requested),
+        )
+    adapter = _PROJECT_SUMMARY_LIST if view == "summary" else _PROJECT_LIST
+    return cached_json(request, response, tags=["projects"], adapter=adapter, render=render)
+
+
+@router.get("/search", response_model=List[ProjectSearchResult])
+def search_projects(
+    request: Request,
+    response: Response,
+    q: str = Query(..., min_length=1, description="Search terms (quotes, OR and -exclusion supported)"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    session: Session = Depends(get_session),
+):
+    """Full-text search over projects, ranked by relevance with highlighted snippets."""
+    def render():
+        hits = run_search(session, select(Project), PROJECT_SEARCH, q, limit)
+        return [
+            ProjectSearchResult.model_validate(
+                {**ProjectRead.model_validate(project).model_dump(), "rank": rank, "snippet": snippet}
+            )
+            for project, rank, snippet in hits
+        ]
+
+    return cached_json(request, response, tags=["projects"], adapter=_PROJECT_SEARCH_RESULTS, render=render)
 
 
 @router.get("/slug/{slug}", response_model=ProjectRead)
-def get_project_by_slug(slug: str, session: Session = Depends(get_session)):
+def get_project_by_slug(
+    slug: str,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+):
     """Look up a single project by its URL slug."""
-    db_project = session.exec(select(Project).where(Project.slug == slug)).first()
-    if not db_project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    return db_project
+    def render():
+        db_project = session.exec(select(Project).where(Project.slug == slug)).first()
+        if not db_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return db_project
+
+    return cached_json(request, response, tags=["projects"], adapter=_PROJECT, render=render)
 
 
 @router.get("/{project_id}", response_model=ProjectRead)
-def get_project_by_id(project_id: uuid.UUID, session: Session = Depends(get_session)):
+def get_project_by_id(
+    project_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    session: Session = Depends(get_session),
+):
     """Récupère un projet par son ID (UUID)."""
-    db_project = session.get(Project, project_id)
-    if not db_project:
-        raise HTTPException(status_code=404, detail="Project not found")
-    return db_project
+    def render():
+        db_project = session.get(Project, project_id)
+        if not db_project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        return db_project
+
+    return cached_json(request, response, tags=["projects"], adapter=_PROJECT, render=render)
 
 
 # ── 3. Écritures (Authentifiées) ────────────────────────────────────────────────
@@ -127,45 +200,111 @@ def get_project_by_id(project_id: uuid.UUID, session: Session = Depends(get_sess
 @router.post("", response_model=ProjectRead)
 async def create_project(
     project: ProjectCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
     # Guard against duplicate slug
-    existing = session.exec(select(Project).where(Project.slug == project.slug)).first()
+    existing = (await session.exec(select(Project).where(Project.slug == project.slug))).first()
     if existing:
         raise HTTPException(status_code=409, detail=f"Slug '{project.slug}' already in use")
 
     db_project = Project.model_validate(project)
     db_project.user_id = current_user.id
     session.add(db_project)
-    session.commit()
-    session.refresh(db_project)
+    await session.commit()
+    await session.refresh(db_project)
     
     # Trigger revalidation
+    invalidate("projects")
     await trigger_revalidation(["/", "/projects", f"/projects/{db_project.slug}"])
     
     return db_project
 
 
+@router.patch("/bulk", response_model=List[ProjectRead])
+async def bulk_update_projects(
+    payload: ProjectBulkUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Apply several partial updates (re-ordering, featuring, …) in one transaction.
+
+    All projects must belong to the current user. Slug conflicts are checked
+    with a single query; the whole batch is rejected on the first error.
+    One cache invalidation and one merged revalidation cover the batch.
+    """
+    ids = [item.id for item in payload.items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=422, detail="Each project may appear only once per batch")
+
+    projects = {
+        p.id: p
+        for p in (await session.exec(select(Project).where(col(Project.id).in_(ids)))).all()
+        if p.user_id == current_user.id
+    }
+    missing = [str(i) for i in ids if i not in projects]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Projects not found: {', '.join(missing)}")
+
+    changes = {item.id: item.model_dump(exclude_unset=True, exclude={"id"}) for item in payload.items}
+    old_slugs = {pid: p.slug for pid, p in projects.items()}
+    new_slugs = {pid: data.get("slug", old_slugs[pid]) for pid, data in changes.items()}
+
+    duplicates = [slug for slug, count in Counter(new_slugs.values()).items() if count > 1]
+    if duplicates:
+        raise HTTPException(status_code=409, detail=f"Slug '{duplicates[0]}' used twice in the batch")
+    requested = {slug for pid, slug in new_slugs.items() if slug != old_slugs[pid]}
+    if requested:
+        clash = (await session.exec(
+            select(Project.slug)
+            .where(col(Project.slug).in_(requested))
+            .where(col(Project.id).not_in(ids))
+            .limit(1)
+        )).first()
+        if clash:
+            raise HTTPException(status_code=409, detail=f"Slug '{clash}' already in use")
+
+    if requested & set(old_slugs.values()):
+        # Slugs swapped inside the batch: park the renamed rows on temporary
+        # slugs first so the unique index never sees two equal values.
+        for pid, slug in new_slugs.items():
+            if slug != old_slugs[pid]:
+                projects[pid].slug = f"{slug}--{pid.hex}"
+        await session.flush()
+
+    for pid, data in changes.items():
+        for key, value in data.items():
+            setattr(projects[pid], key, value)
+        session.add(projects[pid])
+    await session.commit()
+
+    invalidate("projects")
+    slugs = dict.fromkeys([*old_slugs.values(), *new_slugs.values()])
+    await trigger_revalidation(["/", "/projects", *(f"/projects/{slug}" for slug in slugs)])
+
+    return [projects[i] for i in ids]
+
+
 @router.patch("/{project_id}", response_model=ProjectRead)
 async def update_project(
     project_id: uuid.UUID,
     project: ProjectUpdate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
-    db_project = session.get(Project, project_id)
+    db_project = await session.get(Project, project_id)
     if not db_project or db_project.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Project not found")
 
     project_data = project.model_dump(exclude_unset=True)
 
     if "slug" in project_data:
-        clash = session.exec(
+        clash = (await session.exec(
             select(Project)
             .where(Project.slug == project_data["slug"])
             .where(Project.id != project_id)
-        ).first()
+        )).first()
         if clash:
             raise HTTPException(status_code=409, detail=f"Slug '{project_data['slug']}' already in use")
 
@@ -173,10 +312,11 @@ async def update_project(
         setattr(db_project, key, value)
 
     session.add(db_project)
-    session.commit()
-    session.refresh(db_project)
+    await session.commit()
+    await session.refresh(db_project)
     
     # Trigger revalidation
+    invalidate("projects")
     await trigger_revalidation(["/", "/projects", f"/projects/{db_project.slug}"])
     
     return db_project
@@ -185,17 +325,18 @@ async def update_project(
 @router.delete("/{project_id}")
 async def delete_project(
     project_id: uuid.UUID,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
 ):
-    db_project = session.get(Project, project_id)
+    db_project = await session.get(Project, project_id)
     if not db_project or db_project.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Project not found")
     slug = db_project.slug
-    session.delete(db_project)
-    session.commit()
+    await session.delete(db_project)
+    await session.commit()
     
     # Trigger revalidation
+    invalidate("projects")
     await trigger_revalidation(["/", "/projects", f"/projects/{slug}"])
     
     return {"ok": True}
@@ -221,6 +362,7 @@ def admin_update_project(
     session.add(db_project)
     session.commit()
     session.refresh(db_project)
+    invalidate("projects")
     return db_project
 
 
@@ -235,4 +377,5 @@ def admin_delete_project(
         raise HTTPException(status_code=404, detail="Project not found")
     session.delete(db_project)
     session.commit()
+    invalidate("projects")
     return {"ok": True}
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlmodel import Session
+
+from ...models.database import get_session
+from ...services.bundle_service import public_bundle
+from ...services.cache_service import is_not_modified
+
+router = APIRouter(prefix="/public", tags=["Public"])
+
+
+@router.get("/bundle")
+def get_public_bundle(request: Request, session: Session = Depends(get_session)):
+    """
+    Everything the homepage needs in one response:
+    `{profile, featuredProjects, testimonials, articles}`, with the same
+    shapes as `/profile`, `/projects?featured=true`, `/testimonials` and
+    `/articles?published_only=true`.
+
+    Served from a precomputed snapshot; write handlers mark the affected
+    section for rebuild. Supports ETag / If-None-Match.
+    """
+    entry = public_bundle.get(session)
+    headers = entry.validators()
+    if is_not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -1,36 +1,51 @@
 from __future__ import annotations
 
-import asyncio
 import json
 import uuid
-from typing import Any, cast, List
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.database import get_session
+from app.models.database import async_engine, get_async_session
 from app.models.portfolio import Article, SocialPost, SocialPlatform, SocialStatus, User
 from app.schemas.portfolio import SocialGenerated, SocialLinkedIn, SocialTwitter, SocialInstagram, SocialFacebook
 from app.api.routers.auth import get_current_admin
+from app.core.sse import sse_event, sse_response
 from app.services.ai_service import get_ai_client
+from app.services.ai_orchestrator import content_version, generate_batch, stream_batch
 
 router = APIRouter(prefix="/social", tags=["Social"])
 
+SOCIAL_PROMPTS = {
+    "linkedin_story": "Create a LinkedIn post in a storytelling tone aimed at agency buyers.\nUse a strong hook in the first line, 2–3 short paragraphs, and a clear CTA to contact the agency.\nDo not add emojis.",
+    "linkedin_value": "Create a LinkedIn post that is value-driven and educational.\nUse bullet-like short sentences (each on a new line) and end with a CTA to read the full article or contact the agency.\nDo not add emojis.",
+    "twitter_thread": "Create a Twitter/X thread with exactly 5 short tweets.\nReturn the result as a valid JSON array of 5 strings, where each string is one tweet.\nTweets should have strong hooks, be concise, and end the last tweet with a clear CTA to read the article or contact the agency.\nDo not add emojis. Output ONLY the JSON array, nothing else.",
+    "twitter_short": "Create a single, short, punchy tweet (max 240 characters) that teases the article and ends with a clear CTA.\nDo not add emojis.",
+    "instagram": "Create an Instagram caption optimized for saves and shares.\nUse short lines, strong hook at the top, and end with a clear CTA to check the link in bio or contact the agency.\nDo not add emojis.",
+    "facebook": "Create a Facebook post that is friendly but professional.\nUse 2–4 short paragraphs and end with a CTA to read the article or contact the agency.\nDo not add emojis.",
+}
 
-@router.post("/generate/{article_id}", response_model=SocialGenerated)
-async def generate_social_for_article(
-    article_id: uuid.UUID,
-    session: Session = Depends(get_session),
-    current_admin: User = Depends(get_current_admin),
-):
-    article = session.get(Article, article_id)
-    if not article or not article.published:
-        raise HTTPException(status_code=400, detail="Article must exist and be published.")
 
-    try:
-        ai = await get_ai_client(session)
+def _fallback_copy(article: Article) -> dict[str, str]:
+    """Dummy content used when AI is not configured or an item fails."""
+    return {
+        "linkedin_story": f"Check out our latest article: {article.title}\n\n{article.excerpt}\n\nRead more: [link]",
+        "linkedin_value": f"Learn about: {article.title}\n\nKey insights:\n- Point 1\n- Point 2\n- Point 3\n\nContact us for more info.",
+        "twitter_thread": json.dumps([
+            f"Thread: {article.title}",
+            article.excerpt[:100] + "...",
+            "Key takeaway 1",
+            "Key takeaway 2",
+            "Read the full article [link]",
+        ]),
+        "twitter_short": f"Just published: {article.title} [link]",
+        "instagram": f"📈 {article.title}\n\n{article.excerpt[:150]}...\n\nLink in bio 🔗",
+        "facebook": f"Check out our latest insights: {article.title}\n\n{article.excerpt}\n\nRead the full article here: [link]",
+    }
+
 
-        base_context = f"""
+def _social_prompts(article: Article) -> dict[str, str]:
+    base_context = f"""
 You are generating social media copy for a B2B agency.
 Do NOT use emojis unless explicitly requested.
 
@@ -38,50 +53,29 @@ Blog title: "{article.title}"
 Summary: "{article.excerpt}"
 Content: {json.dumps(article.content)}
 """.strip()
+    return {name: base_context + "\n\n" + instructions for name, instructions in SOCIAL_PROMPTS.items()}
 
-        tasks = [
-            ai.generate_text(base_context + "\n\nCreate a LinkedIn post in a storytelling tone aimed at agency buyers.\nUse a strong hook in the first line, 2–3 short paragraphs, and a clear CTA to contact the agency.\nDo not add emojis."),
-            ai.generate_text(base_context + "\n\nCreate a LinkedIn post that is value-driven and educational.\nUse bullet-like short sentences (each on a new line) and end with a CTA to read the full article or contact the agency.\nDo not add emojis."),
-            ai.generate_text(base_context + "\n\nCreate a Twitter/X thread with exactly 5 short tweets.\nReturn the result as a valid JSON array of 5 strings, where each string is one tweet.\nTweets should have strong hooks, be concise, and end the last tweet with a clear CTA to read the article or contact the agency.\nDo not add emojis. Output ONLY the JSON array, nothing else."),
-            ai.generate_text(base_context + "\n\nCreate a single, short, punchy tweet (max 240 characters) that teases the article and ends with a clear CTA.\nDo not add emojis."),
-            ai.generate_text(base_context + "\n\nCreate an Instagram caption optimized for saves and shares.\nUse short lines, strong hook at the top, and end with a clear CTA to check the link in bio or contact the agency.\nDo not add emojis."),
-            ai.generate_text(base_context + "\n\nCreate a Facebook post that is friendly but professional.\nUse 2–4 short paragraphs and end with a CTA to read the article or contact the agency.\nDo not add emojis.")
-        ]
-        
-        results = cast(Any, await asyncio.gather(*tasks))
-        linkedin_story = str(results[0])
-        linkedin_value = str(results[1])
-        twitter_thread_raw = str(results[2])
-        twitter_short = str(results[3])
-        instagram_caption = str(results[4])
-        facebook_post = str(results[5])
-    except Exception as e:
-        print(f"AI Generation failed: {e}")
-        # Return dummy content when AI is not configured or generation fails
-        return SocialGenerated(
-            blog_id=article_id,
-            linkedin=SocialLinkedIn(
-                storytelling=f"Check out our latest article: {article.title}\n\n{article.excerpt}\n\nRead more: [link]",
-                value_driven=f"Learn about: {article.title}\n\nKey insights:\n- Point 1\n- Point 2\n- Point 3\n\nContact us for more info.",
-            ),
-            twitter=SocialTwitter(
-                thread_tweets=[
-                    f"Thread: {article.title}",
-                    article.excerpt[:100] + "...",
-                    "Key takeaway 1",
-                    "Key takeaway 2",
-                    "Read the full article [link]",
-                ],
-                thread_combined=f"Thread: {article.title}\n\n{article.excerpt[:100]}...\n\nKey takeaway 1\nKey takeaway 2\n\nRead the full article [link]",
-                short=f"Just published: {article.title} [link]",
-            ),
-            instagram=SocialInstagram(
-                caption=f"📈 {article.title}\n\n{article.excerpt[:150]}...\n\nLink in bio 🔗"
-            ),
-            facebook=SocialFacebook(
-                post=f"Check out our latest insights: {article.title}\n\n{article.excerpt}\n\nRead the full article here: [link]"
-            ),
-        )
+
+async def _published_article(session: AsyncSession, article_id: uuid.UUID) -> Article:
+    article = await session.get(Article, article_id)
+    if not article or not article.published:
+        raise HTTPException(status_code=400, detail="Article must exist and be published.")
+    return article
+
+
+async def _social_result(
+    session: AsyncSession,
+    article_id: uuid.UUID,
+    generated: dict[str, str],
+    fallback: dict[str, str],
+) -> SocialGenerated:
+    # Items that failed or missed the deadline get dummy content; the others are kept
+    linkedin_story = generated.get("linkedin_story", fallback["linkedin_story"])
+    linkedin_value = generated.get("linkedin_value", fallback["linkedin_value"])
+    twitter_thread_raw = generated.get("twitter_thread", fallback["twitter_thread"])
+    twitter_short = generated.get("twitter_short", fallback["twitter_short"])
+    instagram_caption = generated.get("instagram", fallback["instagram"])
+    facebook_post = generated.get("facebook", fallback["facebook"])
 
     # Parse thread tweets
     thread_tweets: list[str] = []
@@ -95,62 +89,104 @@ Content: {json.dumps(article.content)}
         thread_tweets = list(chunks)[:5]  # type: ignore
     thread_combined = "\n\n".join(thread_tweets)
 
-    # Persist social posts
-    created_posts = [
-        SocialPost(
-            blog_id=article_id,
-            platform=SocialPlatform.LINKEDIN,
-            content=linkedin_story.strip(),
-            status=SocialStatus.READY,
-        ),
-        SocialPost(
-            blog_id=article_id,
-            platform=SocialPlatform.LINKEDIN,
-            content=linkedin_value.strip(),
-            status=SocialStatus.READY,
-        ),
-        SocialPost(
-            blog_id=article_id,
-            platform=SocialPlatform.TWITTER,
-            content=thread_combined.strip(),
-            status=SocialStatus.READY,
-        ),
-        SocialPost(
-            blog_id=article_id,
-            platform=SocialPlatform.TWITTER,
-            content=twitter_short.strip(),
-            status=SocialStatus.READY,
-        ),
-        SocialPost(
-            blog_id=article_id,
-            platform=SocialPlatform.INSTAGRAM,
-            content=instagram_caption.strip(),
-            status=SocialStatus.READY,
-        ),
-        SocialPost(
-            blog_id=article_id,
-            platform=SocialPlatform.FACEBOOK,
-            content=facebook_post.strip(),
-            status=SocialStatus.READY,
-        ),
+    # Persist the AI-generated posts only (dummy content is never saved)
+    posts = [
+        ("linkedin_story", SocialPlatform.LINKEDIN, linkedin_story),
+        ("linkedin_value", SocialPlatform.LINKEDIN, linkedin_value),
+        ("twitter_thread", SocialPlatform.TWITTER, thread_combined),
+        ("twitter_short", SocialPlatform.TWITTER, twitter_short),
+        ("instagram", SocialPlatform.INSTAGRAM, instagram_caption),
+        ("facebook", SocialPlatform.FACEBOOK, facebook_post),
     ]
-
-    for p in created_posts:
-        session.add(p)
-    session.commit()
+    for name, platform, content in posts:
+        if name in generated:
+            session.add(SocialPost(
+                blog_id=article_id,
+                platform=platform,
+                content=content.strip(),
+                status=SocialStatus.READY,
+            ))
+    if generated:
+        await session.commit()
 
     return SocialGenerated(
         blog_id=article_id,
         linkedin=SocialLinkedIn(
-            storytelling=created_posts[0].content,
-            value_driven=created_posts[1].content,
+            storytelling=linkedin_story.strip(),
+            value_driven=linkedin_value.strip(),
         ),
         twitter=SocialTwitter(
             thread_tweets=thread_tweets,
-            thread_combined=created_posts[2].content,
-            short=created_posts[3].content,
+            thread_combined=thread_combined.strip(),
+            short=twitter_short.strip(),
         ),
-        instagram=SocialInstagram(caption=created_posts[4].content),
-        facebook=SocialFacebook(post=created_posts[5].content),
+        instagram=SocialInstagram(caption=instagram_caption.strip()),
+        facebook=SocialFacebook(post=facebook_post.strip()),
     )
 
+
+@router.post("/generate/{article_id}", response_model=SocialGenerated)
+async def generate_social_for_article(
+    article_id: uuid.UUID,
+    session: AsyncSession = Depends(get_async_session),
+    current_admin: User = Depends(get_current_admin),
+):
+    article = await _published_article(session, article_id)
+    prompts = _social_prompts(article)
+
+    try:
+        ai = await get_ai_client(session)
+    except Exception as e:
+        print(f"AI Generation failed: {e}")
+        ai = None
+
+    generated: dict[str, str] = {}
+    if ai is not None:
+        batch = await generate_batch(
+            ai, prompts, version=content_version(article.title, article.excerpt, article.content)
+        )
+        generated = batch.texts
+
+    return await _social_result(session, article_id, generated, _fallback_copy(article))
+
+
+@router.post("/generate/{article_id}/stream")
+async def stream_social_for_article(
+    article_id: uuid.UUID,
+    session: AsyncSession = Depends(get_async_session),
+    current_admin: User = Depends(get_current_admin),
+):
+    """
+    Same generation as POST /social/generate/{article_id}, as server-sent events:
+
+    - ``token``  {"item", "text"}: a text delta of one item (items interleave)
+    - ``item``   {"item", "text"}: an item is complete
+    - ``error``  {"item", "detail"}: an item failed or missed the deadline
+    - ``done``   the SocialGenerated payload (fallback copy for failed items)
+    """
+    article = await _published_article(session, article_id)
+    try:
+        ai = await get_ai_client(session)
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    prompts = _social_prompts(article)
+    version = content_version(article.title, article.excerpt, article.content)
+    fallback = _fallback_copy(article)
+
+    async def events():
+        generated: dict[str, str] = {}
+        async for name, kind, text in stream_batch(ai, prompts, version):
+            if kind == "token":
+                yield sse_event("token", {"item": name, "text": text})
+            elif kind == "done":
+                generated[name] = text
+                yield sse_event("item", {"item": name, "text": text})
+            else:
+                yield sse_event("error", {"item": name, "detail": text})
+        # The request session may already be closed once the body streams
+        async with AsyncSession(async_engine, expire_on_commit=False) as db:
+            result = await _social_result(db, article_id, generated, fallback)
+        yield sse_event("done", result.model_dump(mode="json", by_alias=True))
+
+    return sse_response(events())
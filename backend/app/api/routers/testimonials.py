@@ -1,37 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import TypeAdapter
+from sqlmodel import Session, col, select
 from typing import List, Optional
 
 from ...models.database import get_session
 from ...models.portfolio import Testimonial, User
 from ...schemas.portfolio import (
-    TestimonialRead, TestimonialCreate, TestimonialUpdate
+    TestimonialRead, TestimonialCreate, TestimonialUpdate, TestimonialBulkUpdate
 )
 from .auth import get_current_user, get_current_admin
+from ...core.pagination import keyset_paginate, MAX_PAGE_SIZE
+from ...services.cache_service import cached_json, invalidate
 
 router = APIRouter(prefix="/testimonials", tags=["Testimonials"])
 
+_TESTIMONIAL_LIST = TypeAdapter(List[TestimonialRead])
+
 
 # ─── Public ────────────────────────────────────────────────────────────────────
 
 @router.get("", response_model=List[TestimonialRead])
 def get_testimonials(
+    request: Request,
+    response: Response,
     session: Session = Depends(get_session),
     username: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size (enables cursor pagination)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
 ):
     """
     Public endpoint — used by the portfolio frontend.
     Optionally filter by ?username=<username> to get a specific user's testimonials.
+    Pass ?limit= (and then ?cursor=) to page through results newest first.
     """
-    if username:
-        user = session.exec(select(User).where(User.username == username)).first()
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        return session.exec(
-            select(Testimonial).where(Testimonial.user_id == user.id)
-        ).all()
+    def render():
+        query = select(Testimonial)
+        if username:
+            user = session.exec(select(User).where(User.username == username)).first()
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            query = query.where(Testimonial.user_id == user.id)
+
+        if limit or cursor:
+            # Testimonials have no timestamp; the autoincrement id follows insertion order
+            return keyset_paginate(
+                session, query, response,
+                sort_key=Testimonial.id, id_column=Testimonial.id,
+                limit=limit, cursor=cursor,
+            )
+        return session.exec(query).all()
 
-    return session.exec(select(Testimonial)).all()
+    return cached_json(request, response, tags=["testimonials"], adapter=_TESTIMONIAL_LIST, render=render)
 
 
 # ─── Authenticated user ─────────────────────────────────────────────────────────
@@ -119,9 +138,45 @@ def create_testimonial(
     session.add(db_testimonial)
     session.commit()
     session.refresh(db_testimonial)
+    invalidate("testimonials")
     return db_testimonial
 
 
+@router.patch("/bulk", response_model=List[TestimonialRead])
+def bulk_update_testimonials(
+    payload: TestimonialBulkUpdate,
+    session: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Apply several partial updates in one transaction (all-or-nothing).
+    Every testimonial must belong to the current user.
+    """
+    ids = [item.id for item in payload.items]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=422, detail="Each testimonial may appear only once per batch")
+
+    testimonials = {
+        t.id: t
+        for t in session.exec(select(Testimonial).where(col(Testimonial.id).in_(ids))).all()
+        if t.user_id == current_user.id
+    }
+    missing = [str(i) for i in ids if i not in testimonials]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Testimonials not found: {', '.join(missing)}")
+
+    for item in payload.items:
+        db_testimonial = testimonials[item.id]
+        for key, value in item.model_dump(exclude_unset=True, exclude={"id"}).items():
+            setattr(db_testimonial, key, value)
+        session.add(db_testimonial)
+    session.commit()
+    for db_testimonial in testimonials.values():
+        session.refresh(db_testimonial)
+    invalidate("testimonials")
+    return [testimonials[i] for i in ids]
+
+
 @router.patch("/{testimonial_id}", response_model=TestimonialRead)
 def update_testimonial(
     testimonial_id: int,
@@ -140,6 +195,7 @@ def update_testimonial(
     session.add(db_testimonial)
     session.commit()
     session.refresh(db_testimonial)
+    invalidate("testimonials")
     return db_testimonial
 
 
@@ -154,6 +210,7 @@ def delete_testimonial(
         raise HTTPException(status_code=404, detail="Testimonial not found")
     session.delete(db_testimonial)
     session.commit()
+    invalidate("testimonials")
     return {"ok": True}
 
 
@@ -180,6 +237,7 @@ def admin_update_testimonial(
     session.add(db_testimonial)
     session.commit()
     session.refresh(db_testimonial)
+    invalidate("testimonials")
     return db_testimonial
 
 
@@ -197,4 +255,5 @@ def admin_delete_testimonial(
         raise HTTPException(status_code=404, detail="Testimonial not found")
     session.delete(db_testimonial)
     session.commit()
+    invalidate("testimonials")
     return {"ok": True}
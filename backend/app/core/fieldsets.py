@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import Any, Iterable, Optional, Sequence
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(schema: type[BaseModel], fields: Optional[str]) -> Optional[list[str]]:
+    """
+    Resolve a ``?fields=title,slug,mainImage`` value against ``schema``.
+
+    Names may be given as camelCase aliases or snake_case attributes; the
+    result is the attribute names in request order, always starting with
+    ``id``. Unknown names are a 400 so typos do not silently drop data.
+    """
+    if fields is None:
+        return None
+    by_name = {}
+    for name, info in schema.model_fields.items():
+        by_name[name] = name
+        if info.alias:
+            by_name[info.alias] = name
+
+    wanted = [part.strip() for part in fields.split(",") if part.strip()]
+    unknown = [part for part in wanted if part not in by_name]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id", *(by_name[part] for part in wanted)]))
+
+
+def column_options(model: Any, names: Iterable[str], always: Sequence[str] = ()) -> Any:
+    """
+    ``load_only`` for the mapped columns among ``names`` (plus ``always``,
+    e.g. pagination keys), so every other column is neither selected nor
+    deserialized.
+    """
+    columns = set(model.__table__.columns.keys())
+    wanted = [n for n in dict.fromkeys([*names, *always]) if n in columns]
+    return load_only(*(getattr(model, n) for n in wanted))
+
+
+def sparse_rows(rows: Iterable[Any], schema: type[BaseModel], names: Sequence[str]) -> list[dict[str, Any]]:
+    """Rows reduced to ``names``, keyed by their camelCase alias like the full schema."""
+    keys = [(name, schema.model_fields[name].alias or name) for name in names]
+    return [{alias: getattr(row, name) for name, alias in keys} for row in rows]
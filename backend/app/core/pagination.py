@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlmodel import Session
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _from_json_value(column: Any, value: Any) -> Any:
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    return python_type(value)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor."""
+    raw = json.dumps([_to_json_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> list[Any]:
+    """Decode a cursor back into typed values matching ``columns``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        return [_from_json_value(col, v) for col, v in zip(columns, values)]
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_paginate(
+    session: Session,
+    statement: Any,
+    response: Response,
+    *,
+    sort_key: Any,
+    id_column: Any,
+    limit: Optional[int],
+    cursor: Optional[str],
+    sort_value: Optional[Callable[[Any], Any]] = None,
+    ascending: bool = False,
+) -> list[Any]:
+    """
+    Apply keyset pagination ordered by ``(sort_key DESC, id DESC)``
+    (or both ASC with ``ascending=True``).
+
+    Fetches ``limit + 1`` rows to know whether another page exists; when it
+    does, the cursor for the next page is exposed in the ``X-Next-Cursor``
+    response header so list bodies keep their existing shape.
+    ``sort_value`` extracts the sort value from a row when ``sort_key`` is
+    an expression rather than a plain column.
+    """
+    page_size = limit or DEFAULT_PAGE_SIZE
+    if cursor:
+        last_sort, last_id = decode_cursor(cursor, (sort_key, id_column))
+        key, bound = tuple_(sort_key, id_column), tuple_(last_sort, last_id)
+        statement = statement.where(key > bound if ascending else key < bound)
+
+    order = (sort_key.asc(), id_column.asc()) if ascending else (sort_key.desc(), id_column.desc())
+    statement = statement.order_by(None).order_by(*order).limit(page_size + 1)
+    rows = list(session.exec(statement).all())
+
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        last_sort = sort_value(last) if sort_value else getattr(last, sort_key.key)
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_sort, getattr(last, id_column.key))
+    return rows
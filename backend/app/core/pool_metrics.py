@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+
+_CONNECT_STARTED = "_connect_started"
+
+
+class PoolMetrics:
+    """Counters fed by SQLAlchemy pool events for one engine."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.timeouts = 0
+        self.invalidations = 0
+        self.connects = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.connect_total = 0.0
+        self.connect_max = 0.0
+        self._pool: Any = None
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_timeout(self, seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+            self.waits += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def record_connect(self, seconds: float) -> None:
+        with self._lock:
+            self.connects += 1
+            self.connect_total += seconds
+            self.connect_max = max(self.connect_max, seconds)
+
+    def _incr(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def snapshot(self) -> dict[str, Any]:
+        pool = self._pool
+        with self._lock:
+            data: dict[str, Any] = {
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+                "wait_avg_ms": round(self.wait_total / self.waits * 1000, 3) if self.waits else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "connects": self.connects,
+                "connect_avg_ms": round(self.connect_total / self.connects * 1000, 3) if self.connects else 0.0,
+                "connect_max_ms": round(self.connect_max * 1000, 3),
+            }
+        # QueuePool-style gauges; SQLite's Singleton/Static pools do not have them
+        for gauge in ("size", "checkedin", "checkedout", "overflow"):
+            fn = getattr(pool, gauge, None)
+            data[gauge] = fn() if callable(fn) else None
+        return data
+
+
+def timed_pool_class(base: type, metrics: PoolMetrics) -> type:
+    """Subclass ``base`` so the time spent waiting for a connection is recorded."""
+
+    class TimedPool(base):  # type: ignore[misc, valid-type]
+        def _do_get(self):  # type: ignore[override]
+            started = time.perf_counter()
+            try:
+                conn = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_timeout(time.perf_counter() - started)
+                raise
+            metrics.record_wait(time.perf_counter() - started)
+            return conn
+
+    TimedPool.__name__ = TimedPool.__qualname__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def instrument_engine(engine: Engine, metrics: PoolMetrics) -> None:
+    """Attach pool and dialect listeners to a (sync) engine."""
+    metrics._pool = engine.pool
+
+    @event.listens_for(engine, "do_connect")
+    def _before_connect(dialect, conn_rec, cargs, cparams):
+        conn_rec.info[_CONNECT_STARTED] = time.perf_counter()
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        started = connection_record.info.pop(_CONNECT_STARTED, None)
+        if started is not None:
+            metrics.record_connect(time.perf_counter() - started)
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        metrics._incr("checkouts")
+        metrics._pool = engine.pool
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        metrics._incr("checkins")
+
+    @event.listens_for(engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics._incr("invalidations")
@@ -0,0 +1,19 @@
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # nginx would otherwise buffer the whole stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """One server-sent event; ``data`` is sent as a single JSON line."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode()
+
+
+def sse_response(events: AsyncIterator[bytes]) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,188 @@
+import asyncio
+import functools
+import gzip
+import mimetypes
+import os
+import uuid
+from email.utils import parsedate
+from typing import Callable, List, Optional, Set, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+try:  # .br siblings are only written when the brotli package is installed
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Legacy uploads keep their URL forever too, but nothing guarantees it
+UPLOADS_CACHE_MAX_AGE = int(os.getenv("UPLOADS_CACHE_MAX_AGE", "86400"))
+
+# Types that compress well; images other than SVG are already compressed
+COMPRESSIBLE_TYPES = {
+    "image/svg+xml",
+    "text/plain",
+    "text/css",
+    "text/csv",
+    "text/html",
+    "text/xml",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+}
+# Preferred first when the client accepts both
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+# Not worth a sibling below this size
+MIN_COMPRESS_BYTES = 256
+
+_pending: Set[asyncio.Future] = set()
+
+
+def is_immutable_upload(relative: str) -> bool:
+    """``relative`` is a path under uploads/, with forward slashes."""
+    return relative.startswith(("cas/", "derived/cas/"))
+
+
+def is_compressible(path: str) -> bool:
+    media_type, _ = mimetypes.guess_type(path)
+    return media_type in COMPRESSIBLE_TYPES
+
+
+def precompress_file(path: str) -> None:
+    """Write ``.gz`` (and ``.br``) siblings of ``path`` if missing or stale."""
+    try:
+        source_stat = os.stat(path)
+    except FileNotFoundError:
+        return
+    if source_stat.st_size < MIN_COMPRESS_BYTES:
+        return
+
+    with open(path, "rb") as f:
+        data = f.read()
+    compressors: List[Tuple[str, Callable[[bytes], bytes]]] = [(".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.append((".br", functools.partial(brotli.compress, quality=11)))
+
+    for suffix, compress in compressors:
+        target = path + suffix
+        if _fresh_sibling(target, source_stat) is not None:
+            continue
+        partial = f"{target}.{uuid.uuid4().hex}.part"
+        with open(partial, "wb") as f:
+            f.write(compress(data))
+        os.replace(partial, target)
+
+
+def _fresh_sibling(path: str, source_stat: os.stat_result) -> Optional[os.stat_result]:
+    try:
+        sibling = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return sibling if sibling.st_mtime >= source_stat.st_mtime else None
+
+
+def _accepted_encodings(accept_encoding: str) -> Set[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class UploadsStaticFiles(StaticFiles):
+    """
+    StaticFiles for /uploads.
+
+    - Content-addressed files (``cas/…``) and their resized variants
+      (``derived/cas/…``) never change behind their URL: they are served
+      with a far-future immutable Cache-Control. Other uploads get
+      ``UPLOADS_CACHE_MAX_AGE``.
+    - SVG and text files are served from ``.br`` / ``.gz`` siblings when the
+      client accepts them, with ``Vary: Accept-Encoding`` and an ETag of
+      their own. Missing siblings are written in the background after the
+      first request. Range requests always get the identity bytes, so byte
+      offsets stay meaningful.
+    - If-None-Match uses weak comparison and ``*``; Range / If-Range are
+      handled by FileResponse, which also uses ``http.response.pathsend``
+      (zero-copy) when the server offers it.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        request_headers = Headers(scope=scope)
+        relative = os.path.relpath(full_path, self.directory).replace(os.sep, "/")
+        media_type, _ = mimetypes.guess_type(str(full_path))
+
+        headers = {
+            "Cache-Control": IMMUTABLE_CACHE_CONTROL
+            if is_immutable_upload(relative)
+            else f"public, max-age={UPLOADS_CACHE_MAX_AGE}"
+        }
+        served_path, served_stat = full_path, stat_result
+        if media_type in COMPRESSIBLE_TYPES:
+            headers["Vary"] = "Accept-Encoding"
+            if "range" not in request_headers:
+                encoded = self._pick_encoding(str(full_path), stat_result, request_headers)
+                if encoded is not None:
+                    encoding, served_path, served_stat = encoded
+                    headers["Content-Encoding"] = encoding
+
+        response = FileResponse(
+            served_path,
+            status_code=status_code,
+            stat_result=served_stat,
+            media_type=media_type,
+            headers=headers,
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _pick_encoding(
+        self, path: str, stat_result: os.stat_result, request_headers: Headers
+    ) -> Optional[Tuple[str, str, os.stat_result]]:
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        stale = False
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted or (encoding == "br" and brotli is None):
+                continue
+            sibling = _fresh_sibling(path + suffix, stat_result)
+            if sibling is not None:
+                return encoding, path + suffix, sibling
+            stale = True
+        if stale and stat_result.st_size >= MIN_COMPRESS_BYTES:
+            self._precompress_later(path)
+        return None
+
+    @staticmethod
+    def _precompress_later(path: str) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        future = loop.run_in_executor(None, precompress_file, path)
+        _pending.add(future)
+        future.add_done_callback(_pending.discard)
+
+    def is_not_modified(self, response_headers: Headers, request_headers: Headers) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            # Weak comparison (RFC 9110 §13.1.2); If-Modified-Since is then ignored
+            if if_none_match.strip() == "*":
+                return True
+            etag = response_headers["etag"].removeprefix("W/")
+            return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+        if_modified_since = parsedate(request_headers.get("if-modified-since", ""))
+        last_modified = parsedate(response_headers.get("last-modified", ""))
+        return if_modified_since is not None and last_modified is not None and if_modified_since >= last_modified
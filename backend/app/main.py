@@ -1,20 +1,34 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
-from app.api.routers import auth, profile, projects, testimonials, media, articles, ai, contact, social, settings
+from app.api.routers import auth, profile, projects, testimonials, media, articles, ai, contact, social, settings, metrics, public
 from app.models.database import init_db
+from app.core.body_limit import BodySizeLimitMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.static_files import UploadsStaticFiles
 from app.services.scheduler_service import start_scheduler, stop_scheduler
+from app.services.http_client import start_http_client, stop_http_client
+from app.services.revalidation_service import start_revalidation_worker, stop_revalidation_worker
+from app.services.image_service import start_image_pool, stop_image_pool
+from app.services.outbox_service import start_outbox_worker, stop_outbox_worker
 import os
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    start_scheduler()
+    await start_http_client()
+    await start_scheduler()
+    start_revalidation_worker()
+    start_outbox_worker()
+    start_image_pool()
     yield
     # Shutdown
+    stop_image_pool()
+    await stop_outbox_worker()
+    await stop_revalidation_worker()
     stop_scheduler()
+    await stop_http_client()
 
 app = FastAPI(
     title="Portfolio API",
@@ -23,6 +37,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Reject oversized uploads before the multipart parser spools them to disk.
+# Added before CORS so CORS wraps it and the 413 stays readable by the browser.
+app.add_middleware(BodySizeLimitMiddleware, limits={"/media/upload": media.MAX_UPLOAD_BODY_BYTES})
+
 # CORS configuration — must be registered BEFORE mounting static files
 # so that /uploads/* responses also carry CORS headers.
 app.add_middleware(
@@ -31,14 +49,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 # Create uploads directory and subfolders
-for folder in ["uploads", "uploads/testimonials", "uploads/articles", "uploads/projects"]:
+for folder in ["uploads", "uploads/testimonials", "uploads/articles", "uploads/projects", "uploads/cas"]:
     os.makedirs(folder, exist_ok=True)
 
 # Mount uploads directory to serve files (after middleware so CORS applies)
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", UploadsStaticFiles(directory="uploads"), name="uploads")
 
 @app.on_event("startup")
 def on_startup():
@@ -54,6 +73,8 @@ app.include_router(ai.router)
 app.include_router(contact.router)
 app.include_router(social.router)
 app.include_router(settings.router)
+app.include_router(metrics.router)
+app.include_router(public.router)
 
 @app.get("/")
 async def root():
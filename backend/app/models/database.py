@@ -1,17 +1,81 @@
 from sqlmodel import create_engine, Session, SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .portfolio import *
+from . import events  # registers the derived-table hooks
+from ..core.pool_metrics import PoolMetrics, instrument_engine, timed_pool_class
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+if not DATABASE_URL:
+    raise RuntimeError("DATABASE_URL is not set")
 
-engine = create_engine(DATABASE_URL)
+# Connection pool tuning (ignored for SQLite, which uses its own pools)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Async drivers for the sync URLs we accept in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def _async_database_url(url: str) -> str:
+    """Derive the async URL (asyncpg / aiosqlite) from DATABASE_URL unless ASYNC_DATABASE_URL is set."""
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        return override
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _pool_options(url: str, queue_pool: type, metrics: PoolMetrics) -> dict:
+    options: dict = {"pool_pre_ping": DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+    return {
+        **options,
+        "poolclass": timed_pool_class(queue_pool, metrics),
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+ASYNC_DATABASE_URL = _async_database_url(DATABASE_URL)
+pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+engine = create_engine(DATABASE_URL, **_pool_options(DATABASE_URL, QueuePool, pool_metrics))
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **_pool_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool, async_pool_metrics)
+)
+instrument_engine(engine, pool_metrics)
+instrument_engine(async_engine.sync_engine, async_pool_metrics)
 
 def init_db():
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        events.seed_unread_counter(connection)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    """Non-blocking session for ``async def`` routes; keeps loaded attributes usable after commit."""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
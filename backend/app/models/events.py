@@ -0,0 +1,193 @@
+"""
+ORM event hooks that keep derived tables in sync with their source rows.
+
+The hooks run inside the writer's flush, so derived rows commit (or roll
+back) together with the change that produced them, whichever code path
+made it: routers, the scheduler or the maintenance scripts.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import delete, event, func, insert, inspect, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from sqlmodel import col
+
+from .portfolio import (
+    Article,
+    ArticleTagCount,
+    ContactCounter,
+    ContactMessage,
+    ContactStatus,
+    ContentChange,
+    Profile,
+    Project,
+    Testimonial,
+    table_of,
+)
+
+UNREAD_COUNTER = "unread"
+
+# Public content whose writes are appended to the ContentChange log
+CHANGE_TRACKED = {
+    Project: "project",
+    Article: "article",
+    Testimonial: "testimonial",
+    Profile: "profile",
+}
+
+
+def _upsert_insert(connection: Any) -> Any:
+    """Dialect ``insert`` exposing ``on_conflict_do_update`` (Postgres and SQLite)."""
+    return pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+
+
+def _previous(obj: Any, attr: str) -> Any:
+    """Value of ``attr`` before this flush (the current one if unchanged)."""
+    history = inspect(obj).attrs[attr].history
+    if not history.has_changes():
+        return getattr(obj, attr)
+    return history.deleted[0] if history.deleted else None
+
+
+def _public_tags(published: Any, archived: Any, tags: Any) -> set:
+    return set(tags or []) if published and not archived else set()
+
+
+def tag_count_deltas(session: Session) -> Counter:
+    """Per-tag change in public articles made by this flush (inserts, updates, deletes)."""
+    deltas: Counter = Counter()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, Article):
+            continue
+        before = set() if obj in session.new else _public_tags(
+            _previous(obj, "published"), _previous(obj, "archived"), _previous(obj, "tags")
+        )
+        after = set() if obj in session.deleted else _public_tags(obj.published, obj.archived, obj.tags)
+        deltas.update(after - before)
+        deltas.subtract(before - after)
+    return deltas
+
+
+def adjust_tag_counts(session: Session) -> None:
+    """
+    Apply this flush's tag deltas to ArticleTagCount with one upsert, so
+    concurrent writers only add to each other's counts. Tags whose count
+    drops to zero are removed.
+    """
+    deltas = {tag: delta for tag, delta in tag_count_deltas(session).items() if delta}
+    if not deltas:
+        return
+    connection = session.connection()
+    table = table_of(ArticleTagCount)
+    stmt = _upsert_insert(connection)(table)
+    connection.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.c.tag], set_={"count": table.c.count + stmt.excluded["count"]}
+        ),
+        [{"tag": tag, "count": delta} for tag, delta in deltas.items()],
+    )
+    dropped = [tag for tag, delta in deltas.items() if delta < 0]
+    if dropped:
+        connection.execute(delete(table).where(table.c.tag.in_(dropped), table.c.count <= 0))
+
+
+def rebuild_tag_counts(connection: Any) -> None:
+    """Repair: recompute the whole ArticleTagCount aggregate from the public articles."""
+    rows = connection.execute(
+        select(col(Article.tags)).where(col(Article.published) == True, col(Article.archived) == False)
+    ).all()
+    counts = Counter(tag for (tags,) in rows for tag in dict.fromkeys(tags or []))
+    connection.execute(delete(ArticleTagCount))
+    if counts:
+        connection.execute(
+            insert(ArticleTagCount),
+            [{"tag": tag, "count": count} for tag, count in counts.items()],
+        )
+
+
+def count_unread(connection: Any) -> int:
+    return connection.execute(
+        select(func.count()).select_from(ContactMessage).where(col(ContactMessage.status) == ContactStatus.NEW)
+    ).scalar_one()
+
+
+def _was_unread(obj: ContactMessage) -> bool:
+    history = get_history(obj, "status")
+    before = history.deleted[0] if history.deleted else obj.status
+    return before == ContactStatus.NEW
+
+
+def adjust_unread_count(session: Session) -> None:
+    """Apply this flush's NEW-status transitions to the unread counter."""
+    delta = 0
+    for obj in session.new:
+        if isinstance(obj, ContactMessage):
+            delta += obj.status == ContactStatus.NEW
+    for obj in session.dirty:
+        if isinstance(obj, ContactMessage):
+            delta += (obj.status == ContactStatus.NEW) - _was_unread(obj)
+    for obj in session.deleted:
+        if isinstance(obj, ContactMessage):
+            delta -= _was_unread(obj)
+    if not delta:
+        return
+    connection = session.connection()
+    table = table_of(ContactCounter)
+    # One statement, safe against concurrent first writers; the row is
+    # normally seeded (migration or init_db), so the insert branch only
+    # runs on an empty database.
+    stmt = _upsert_insert(connection)(table).values(name=UNREAD_COUNTER, value=delta)
+    connection.execute(
+        stmt.on_conflict_do_update(index_elements=[table.c.name], set_={"value": table.c.value + stmt.excluded["value"]})
+    )
+
+
+def seed_unread_counter(connection: Any) -> None:
+    """Create the unread counter from the current count if it does not exist yet."""
+    stmt = _upsert_insert(connection)(table_of(ContactCounter)).values(
+        name=UNREAD_COUNTER, value=count_unread(connection)
+    )
+    connection.execute(stmt.on_conflict_do_nothing(index_elements=["name"]))
+
+
+def _previous_slug(obj: Any) -> Any:
+    if not hasattr(obj, "slug"):
+        return None
+    history = inspect(obj).attrs.slug.history
+    return history.deleted[0] if history.deleted else None
+
+
+def record_content_changes(session: Session) -> None:
+    """Append one ContentChange row per public row inserted, updated or deleted in this flush."""
+    now = datetime.utcnow()
+    rows = []
+    for obj in (*session.new, *session.dirty):
+        entity = CHANGE_TRACKED.get(type(obj))
+        if entity and (obj in session.new or session.is_modified(obj)):
+            rows.append({
+                "entity": entity, "entity_id": str(obj.id), "deleted": False,
+                "previous_slug": _previous_slug(obj), "changed_at": now,
+            })
+    for obj in session.deleted:
+        entity = CHANGE_TRACKED.get(type(obj))
+        if entity:
+            rows.append({
+                "entity": entity, "entity_id": str(obj.id), "deleted": True,
+                "previous_slug": getattr(obj, "slug", None), "changed_at": now,
+            })
+    if rows:
+        session.connection().execute(insert(ContentChange), rows)
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_derived_tables(session: Session, flush_context: Any) -> None:
+    touched = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, Article) for obj in touched):
+        adjust_tag_counts(session)
+    if any(isinstance(obj, ContactMessage) for obj in touched):
+        adjust_unread_count(session)
+    record_content_changes(session)
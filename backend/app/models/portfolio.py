@@ -1,10 +1,16 @@
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, cast
 from sqlmodel import SQLModel, Field, JSON, Relationship
+from sqlalchemy import Column, Index, Table, inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
 import uuid
 from datetime import datetime
 from enum import Enum
 from .blog import BlogStatus
 
+def table_of(model: type) -> Table:
+    """Core table of a table=True model, for conditional UPDATE / DELETE and upserts."""
+    return cast(Table, inspect(model).local_table)
+
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(index=True, unique=True)
@@ -58,6 +64,17 @@ class Testimonial(SQLModel, table=True):
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
 
 class Article(SQLModel, table=True):
+    __table_args__ = (
+        # Containment (@>) lookups for tag filtering
+        Index("ix_article_tags", "tags", postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}),
+        # Next due publication (scheduler); only the few scheduled rows are indexed
+        Index(
+            "ix_article_scheduled_due", "status", "published_at",
+            postgresql_where=text("status = 'scheduled'"),
+            sqlite_where=text("status = 'scheduled'"),
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     title: str
     slug: str = Field(index=True, unique=True)
@@ -66,7 +83,7 @@ class Article(SQLModel, table=True):
     content: Dict[str, Any] = Field(default={}, sa_type=JSON) # intro, sections [{heading, body}]
     cta: Dict[str, str] = Field(default={}, sa_type=JSON) # text, url
     related_project_id: Optional[uuid.UUID] = Field(default=None, foreign_key="project.id")
-    tags: List[str] = Field(default=[], sa_type=JSON)
+    tags: List[str] = Field(default=[], sa_column=Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False, default=[]))
     seo: Dict[str, Any] = Field(default={}, sa_type=JSON) # metaTitle, metaDescription, keywords
     published: bool = Field(default=False)
     archived: bool = Field(default=False)
@@ -84,6 +101,12 @@ class Article(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class ArticleTagCount(SQLModel, table=True):
+    """Per-tag count of public (published, not archived) articles, kept in sync on every article flush."""
+    tag: str = Field(primary_key=True)
+    count: int = Field(default=0)
+
+
 # --- Contact / Inbox ---
 
 class ContactStatus(str, Enum):
@@ -100,6 +123,13 @@ class PriorityLevel(str, Enum):
 
 
 class ContactMessage(SQLModel, table=True):
+    __table_args__ = (
+        # Admin inbox: filter on status / priority, newest first
+        Index("ix_contactmessage_status_created_at", "status", "created_at"),
+        Index("ix_contactmessage_priority_created_at", "priority", "created_at"),
+        Index("ix_contactmessage_created_at", "created_at"),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
     name: str
     email: str
@@ -116,6 +146,12 @@ class ContactMessage(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+class ContactCounter(SQLModel, table=True):
+    """Inbox counters (e.g. unread messages), kept in sync on every ContactMessage flush."""
+    name: str = Field(primary_key=True)
+    value: int = Field(default=0)
+
+
 # --- Social Posts ---
 
 class SocialPlatform(str, Enum):
@@ -139,6 +175,87 @@ class SocialPost(SQLModel, table=True):
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 
+# --- Change log ---
+
+class ContentChange(SQLModel, table=True):
+    """Append-only log of public content writes (ORM hook), read by export_static.py."""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    entity: str = Field(index=True)  # project | article | testimonial | profile
+    entity_id: str
+    deleted: bool = False
+    # Slug the row had before this change, when it was renamed or deleted
+    previous_slug: Optional[str] = None
+    changed_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+# --- Media ---
+
+class MediaAsset(SQLModel, table=True):
+    """Content-addressed upload, stored once under uploads/cas/ whatever the number of uploads."""
+    sha256: str = Field(primary_key=True)
+    url: str = Field(index=True, unique=True)
+    content_type: str
+    size_bytes: int
+    # Snapshot taken by each gc_media.py run, not maintained on write
+    gc_reference_count: int = Field(default=0)
+    last_referenced_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# --- Rate limiting ---
+
+class RateLimitBucket(SQLModel, table=True):
+    """Request count of one key in one fixed window (shared rate-limit backend)."""
+    key: str = Field(primary_key=True)
+    window_index: int = Field(primary_key=True)
+    count: int = Field(default=0)
+
+
+# --- Revalidation queue ---
+
+class RevalidationStatus(str, Enum):
+    PENDING = "PENDING"
+    FAILED = "FAILED"
+
+
+class RevalidationJob(SQLModel, table=True):
+    """Pending ISR revalidation for one frontend; deleted once delivered."""
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    frontend_url: str = Field(index=True)
+    paths: List[str] = Field(default_factory=list, sa_type=JSON)
+    status: RevalidationStatus = Field(default=RevalidationStatus.PENDING, index=True)
+    attempts: int = Field(default=0)
+    # Bumped on every merge so concurrent enqueuers never lose paths
+    version: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+# --- Email outbox ---
+
+class OutboxStatus(str, Enum):
+    PENDING = "PENDING"
+    FAILED = "FAILED"
+
+
+class OutboxEmail(SQLModel, table=True):
+    """Notification email written in the same commit as its cause; deleted once sent."""
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    subject: str
+    html: str
+    # Pending rows sharing a key are sent together as one digest
+    digest_key: Optional[str] = Field(default=None, index=True)
+    status: OutboxStatus = Field(default=OutboxStatus.PENDING, index=True)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
 # --- Settings ---
 
 class Setting(SQLModel, table=True):
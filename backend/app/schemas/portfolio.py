@@ -2,10 +2,13 @@ from typing import Optional, List, Dict, Any
 from sqlmodel import SQLModel
 import uuid
 from datetime import datetime
-from pydantic import ConfigDict, EmailStr
+from pydantic import ConfigDict, EmailStr, Field
 from pydantic.alias_generators import to_camel
 from ..models.blog import BlogStatus
 
+# Upper bound on the number of rows a single bulk request may touch
+BULK_MAX_ITEMS = 200
+
 # --- Profile ---
 class ProfileBase(SQLModel):
     model_config = ConfigDict(
@@ -107,6 +110,39 @@ class ProjectRead(ProjectBase):
     id: uuid.UUID
     created_at: datetime
 
+class ProjectSummary(SQLModel):
+    """Card-grid projection: no description / results / screenshots / interveners."""
+    model_config = {
+        "alias_generator": to_camel,
+        "populate_by_name": True,
+        "from_attributes": True,
+    }
+
+    id: uuid.UUID
+    title: str
+    slug: str
+    client_name: Optional[str] = None
+    industry: Optional[str] = None
+    main_image: Optional[str] = None
+    is_featured: bool = False
+    agency_visible: bool = False
+    created_at: datetime
+
+class ProjectBulkItem(ProjectUpdate):
+    id: uuid.UUID
+
+class ProjectBulkUpdate(SQLModel):
+    model_config = {
+        "alias_generator": to_camel,
+        "populate_by_name": True,
+    }
+
+    items: List[ProjectBulkItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
+class ProjectSearchResult(ProjectRead):
+    rank: float
+    snippet: Optional[str] = None # highlighted with <mark>
+
 # --- Testimonial ---
 class TestimonialBase(SQLModel):
     model_config = ConfigDict(
@@ -146,6 +182,17 @@ class TestimonialUpdate(SQLModel):
 class TestimonialRead(TestimonialBase):
     id: int
 
+class TestimonialBulkItem(TestimonialUpdate):
+    id: int
+
+class TestimonialBulkUpdate(SQLModel):
+    model_config = {
+        "alias_generator": to_camel,
+        "populate_by_name": True,
+    }
+
+    items: List[TestimonialBulkItem] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+
 # --- Article ---
 class ArticleBase(SQLModel):
     model_config = ConfigDict(
@@ -204,6 +251,50 @@ class ArticleRead(ArticleBase):
     id: uuid.UUID
     created_at: datetime
 
+class ArticleSummary(SQLModel):
+    """Listing projection: no content / cta / seo JSON."""
+    model_config = {
+        "alias_generator": to_camel,
+        "populate_by_name": True,
+        "from_attributes": True,
+    }
+
+    id: uuid.UUID
+    title: str
+    slug: str
+    excerpt: str
+    cover_image: Optional[str] = None
+    tags: List[str] = []
+    reading_time: int = 5
+    published: bool = False
+    archived: bool = False
+    status: BlogStatus = BlogStatus.draft
+    published_at: Optional[datetime] = None
+    created_at: datetime
+
+class ArticleBulkArchive(SQLModel):
+    model_config = {
+        "alias_generator": to_camel,
+        "populate_by_name": True,
+    }
+
+    ids: List[uuid.UUID] = Field(min_length=1, max_length=BULK_MAX_ITEMS)
+    archived: bool = True
+
+class ArticleSearchResult(ArticleRead):
+    rank: float
+    snippet: Optional[str] = None # highlighted with <mark>
+
+class TagCount(SQLModel):
+    model_config = {
+        "alias_generator": to_camel,
+        "populate_by_name": True,
+        "from_attributes": True,
+    }
+
+    tag: str
+    count: int
+
 
 # --- Contact / Inbox ---
 
@@ -318,7 +409,7 @@ class SettingsUpdate(SQLModel):
     )
 
     ai_api_key: Optional[str] = None
-    ai_provider: Optional[str] = None  # GEMINI, OPENAI, CLAUDE
+    ai_provider: Optional[str] = None  # GEMINI, OPENAI, CLAUDE, FAKE (local, no key)
     email_provider: Optional[str] = None  # RESEND, SENDGRID, NONE
     email_api_key: Optional[str] = None
     notification_email: Optional[EmailStr] = None
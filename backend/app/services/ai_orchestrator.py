@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from .ai_service import AIClient
+
+logger = logging.getLogger(__name__)
+
+# Calls in flight per provider, across every request of this worker
+AI_PROVIDER_CONCURRENCY = int(os.getenv("AI_PROVIDER_CONCURRENCY", "4"))
+# Whole batch budget; items not done by then fall back, the others are kept
+AI_BATCH_DEADLINE_SECONDS = float(os.getenv("AI_BATCH_DEADLINE_SECONDS", "45"))
+# A duplicate call is sent when the first has not answered after this delay (0 = off)
+AI_HEDGE_AFTER_SECONDS = float(os.getenv("AI_HEDGE_AFTER_SECONDS", "10"))
+AI_CACHE_TTL_SECONDS = float(os.getenv("AI_CACHE_TTL_SECONDS", "86400"))
+AI_CACHE_MAX_ENTRIES = int(os.getenv("AI_CACHE_MAX_ENTRIES", "256"))
+
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _semaphore(provider: str) -> asyncio.Semaphore:
+    semaphore = _semaphores.get(provider)
+    if semaphore is None:
+        semaphore = _semaphores[provider] = asyncio.Semaphore(AI_PROVIDER_CONCURRENCY)
+    return semaphore
+
+
+def content_version(*parts: object) -> str:
+    """Fingerprint of the source content a batch is generated from."""
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+
+def cache_key(client: AIClient, prompt: str, version: str) -> str:
+    raw = "\0".join((client.provider, client.model, prompt, version))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class GenerationCache:
+    """Thread-safe LRU of successful generations, with a TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            text, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return text
+
+    def set(self, key: str, text: str) -> None:
+        with self._lock:
+            self._entries[key] = (text, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+generation_cache = GenerationCache(AI_CACHE_MAX_ENTRIES, AI_CACHE_TTL_SECONDS)
+
+
+@dataclass
+class BatchResult:
+    """Generated text per item; failed or late items are missing from ``texts``."""
+    texts: Dict[str, str] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    cached: int = 0
+    hedged: int = 0
+
+
+async def _call(client: AIClient, prompt: str) -> str:
+    async with _semaphore(client.provider):
+        return await client.generate_text(prompt)
+
+
+async def _hedged_call(client: AIClient, prompt: str, result: BatchResult) -> str:
+    """
+    First answer wins. The duplicate is only sent if a provider slot is
+    free, so hedging never queues behind real work.
+    """
+    first = asyncio.ensure_future(_call(client, prompt))
+    attempts = {first}
+    try:
+        if AI_HEDGE_AFTER_SECONDS > 0:
+            await asyncio.wait(attempts, timeout=AI_HEDGE_AFTER_SECONDS)
+            if not first.done() and not _semaphore(client.provider).locked():
+                result.hedged += 1
+                attempts.add(asyncio.ensure_future(_call(client, prompt)))
+        while attempts:
+            done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+            for attempt in done:
+                if attempt.exception() is None:
+                    return attempt.result()
+        # Every attempt failed: surface the first error
+        return first.result()
+    finally:
+        # Loser of the race, or everything when the batch deadline cancels us
+        for attempt in attempts:
+            attempt.cancel()
+
+
+async def generate_batch(
+    client: AIClient,
+    prompts: Dict[str, str],
+    version: str,
+    deadline_seconds: float = AI_BATCH_DEADLINE_SECONDS,
+) -> BatchResult:
+    """
+    Run every prompt concurrently (bounded per provider), serving unchanged
+    ones from the cache. Never raises: items that fail or miss the deadline
+    are reported in ``errors`` and the caller falls back for those only.
+    """
+    result = BatchResult()
+    keys: Dict[str, str] = {}
+    pending: Dict[asyncio.Future, str] = {}
+    for name, prompt in prompts.items():
+        keys[name] = cache_key(client, prompt, version)
+        cached = generation_cache.get(keys[name])
+        if cached is not None:
+            result.texts[name] = cached
+            result.cached += 1
+        else:
+            pending[asyncio.ensure_future(_hedged_call(client, prompt, result))] = name
+
+    if pending:
+        done, late = await asyncio.wait(pending, timeout=deadline_seconds)
+        for task in late:
+            task.cancel()
+            result.errors[pending[task]] = "deadline exceeded"
+        for task in done:
+            name = pending[task]
+            error = task.exception()
+            if error is not None:
+                result.errors[name] = f"{type(error).__name__}: {error}"
+                continue
+            result.texts[name] = task.result()
+            generation_cache.set(keys[name], task.result())
+
+    if result.errors:
+        logger.warning("AI generation (%s) incomplete: %s", client.provider, result.errors)
+    return result
+
+
+async def stream_batch(
+    client: AIClient,
+    prompts: Dict[str, str],
+    version: str,
+    deadline_seconds: float = AI_BATCH_DEADLINE_SECONDS,
+) -> AsyncIterator[Tuple[str, str, str]]:
+    """
+    Streaming counterpart of generate_batch: yields ``(item, kind, text)``
+    where kind is ``token`` (a delta), ``done`` (full text, now cached) or
+    ``error``. Items stream concurrently under the same provider semaphore
+    and deadline; cache hits come out first as a single token. Streams are
+    not hedged, a half-sent item cannot be swapped for another attempt.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run(name: str, prompt: str, key: str) -> None:
+        parts = []
+        try:
+            async with _semaphore(client.provider):
+                async for delta in client.stream_text(prompt):
+                    parts.append(delta)
+                    queue.put_nowait((name, "token", delta))
+        except Exception as e:
+            queue.put_nowait((name, "error", f"{type(e).__name__}: {e}"))
+            return
+        text = "".join(parts)
+        generation_cache.set(key, text)
+        queue.put_nowait((name, "done", text))
+
+    tasks = []
+    remaining = set()
+    for name, prompt in prompts.items():
+        key = cache_key(client, prompt, version)
+        cached = generation_cache.get(key)
+        if cached is not None:
+            yield name, "token", cached
+            yield name, "done", cached
+        else:
+            remaining.add(name)
+            tasks.append(asyncio.ensure_future(run(name, prompt, key)))
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_seconds
+    try:
+        while remaining:
+            try:
+                name, kind, text = await asyncio.wait_for(queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            if kind != "token":
+                remaining.discard(name)
+            yield name, kind, text
+        for name in remaining:
+            yield name, "error", "deadline exceeded"
+    finally:
+        # Deadline reached or client gone: stop the provider calls
+        for task in tasks:
+            task.cancel()
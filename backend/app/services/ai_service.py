@@ -1,73 +1,149 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import os
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-import httpx
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..core.encryption import decrypt_value
-from ..models.portfolio import Setting
+from . import http_client
+from .settings_service import SettingsSnapshot, settings_snapshot
+
+
+# Latency of the FAKE provider, to benchmark the orchestrator without an LLM
+AI_FAKE_LATENCY_MS = float(os.getenv("AI_FAKE_LATENCY_MS", "300"))
+
+# Overridable to point a provider at a proxy or a local fake (fake_llm_server.py)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com").rstrip("/")
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com").rstrip("/")
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com").rstrip("/")
+
+SYSTEM_PROMPT = "You are a copywriter for a B2B agency. Avoid emojis unless explicitly requested."
+# Streams are bounded per read (gap between two chunks), not as a whole
+STREAM_READ_TIMEOUT = 40
+
+
+async def _sse_data(response) -> AsyncIterator[str]:
+    """``data:`` payloads of a server-sent events body, one per event."""
+    data: list[str] = []
+    async for line in response.aiter_lines():
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+        elif line.startswith("data:"):
+            data.append(line[5:].lstrip(" "))
+    if data:
+        yield "\n".join(data)
 
 
 class AIClient:
+    provider = ""
+    model = ""
+
     async def generate_text(self, prompt: str) -> str:
         raise NotImplementedError
 
+    async def stream_text(self, prompt: str) -> AsyncIterator[str]:
+        """Yield the completion as text deltas, as the provider produces them."""
+        yield await self.generate_text(prompt)
+
+
+class FakeAIClient(AIClient):
+    """Local provider: deterministic text after a fixed delay, no network, no key."""
+    provider = "FAKE"
+
+    def __init__(self, model: str = "fake", latency_ms: float = AI_FAKE_LATENCY_MS) -> None:
+        self.model = model
+        self.latency_ms = latency_ms
+
+    async def generate_text(self, prompt: str) -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        if "JSON array" in prompt:
+            return json.dumps([f"Fake tweet {i} ({digest})" for i in range(1, 6)])
+        return f"Fake copy ({digest}): {prompt.strip().splitlines()[-1]}"
+
+    async def stream_text(self, prompt: str) -> AsyncIterator[str]:
+        # Same text as generate_text, first word after the latency then word by word
+        words = (await self.generate_text(prompt)).split(" ")
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(self.latency_ms / 1000 / len(words))
+            yield word if i == 0 else " " + word
+
 
 class OpenAIClient(AIClient):
+    provider = "OPENAI"
+
     def __init__(self, api_key: str, model: str = "gpt-4.1-mini") -> None:
         self.api_key = api_key
         self.model = model
 
+    def _request(self, prompt: str, stream: bool) -> dict:
+        return {
+            "url": f"{OPENAI_BASE_URL}/v1/chat/completions",
+            "headers": {
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            "json": {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt},
+                ],
+                "temperature": 0.7,
+                "stream": stream,
+            },
+        }
+
     async def generate_text(self, prompt: str) -> str:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a copywriter for a B2B agency. Avoid emojis unless explicitly requested.",
-                        },
-                        {"role": "user", "content": prompt},
-                    ],
-                    "temperature": 0.7,
-                },
-                timeout=40,
-            )
+        resp = await http_client.post(**self._request(prompt, stream=False), timeout=40)
         resp.raise_for_status()
         data = resp.json()
         return data.get("choices", [{}])[0].get("message", {}).get("content", "")
 
+    async def stream_text(self, prompt: str) -> AsyncIterator[str]:
+        request = self._request(prompt, stream=True)
+        async with http_client.stream("POST", request.pop("url"), **request, timeout=STREAM_READ_TIMEOUT) as resp:
+            resp.raise_for_status()
+            async for data in _sse_data(resp):
+                if data == "[DONE]":
+                    return
+                delta = (json.loads(data).get("choices") or [{}])[0].get("delta", {}).get("content")
+                if delta:
+                    yield delta
+
 
 class ClaudeClient(AIClient):
+    provider = "CLAUDE"
+
     def __init__(self, api_key: str, model: str = "claude-3.5-sonnet") -> None:
         self.api_key = api_key
         self.model = model
 
+    def _request(self, prompt: str, stream: bool) -> dict:
+        return {
+            "url": f"{ANTHROPIC_BASE_URL}/v1/messages",
+            "headers": {
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01",
+                "Content-Type": "application/json",
+            },
+            "json": {
+                "model": self.model,
+                "max_tokens": 800,
+                "system": SYSTEM_PROMPT,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": stream,
+            },
+        }
+
     async def generate_text(self, prompt: str) -> str:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                "https://api.anthropic.com/v1/messages",
-                headers={
-                    "x-api-key": self.api_key,
-                    "anthropic-version": "2023-06-01",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": self.model,
-                    "max_tokens": 800,
-                    "system": "You are a copywriter for a B2B agency. Avoid emojis unless explicitly requested.",
-                    "messages": [{"role": "user", "content": prompt}],
-                },
-                timeout=40,
-            )
+        resp = await http_client.post(**self._request(prompt, stream=False), timeout=40)
         resp.raise_for_status()
         data = resp.json()
         blocks = data.get("content", [])
@@ -76,28 +152,43 @@ class ClaudeClient(AIClient):
                 return b.get("text", "")
         return ""
 
+    async def stream_text(self, prompt: str) -> AsyncIterator[str]:
+        request = self._request(prompt, stream=True)
+        async with http_client.stream("POST", request.pop("url"), **request, timeout=STREAM_READ_TIMEOUT) as resp:
+            resp.raise_for_status()
+            async for data in _sse_data(resp):
+                event = json.loads(data)
+                if event.get("type") == "content_block_delta":
+                    text = event.get("delta", {}).get("text")
+                    if text:
+                        yield text
+                elif event.get("type") == "message_stop":
+                    return
+                elif event.get("type") == "error":
+                    raise RuntimeError(event.get("error", {}).get("message", "stream error"))
+
 
 class GeminiClient(AIClient):
+    provider = "GEMINI"
+
     def __init__(self, api_key: str, model: str = "gemini-1.5-pro-latest") -> None:
         self.api_key = api_key
         self.model = model
 
+    def _body(self, prompt: str) -> dict:
+        return {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [{"text": prompt}],
+                }
+            ],
+            "safetySettings": [],
+        }
+
     async def generate_text(self, prompt: str) -> str:
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent?key={self.api_key}"
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                url,
-                json={
-                    "contents": [
-                        {
-                            "role": "user",
-                            "parts": [{"text": prompt}],
-                        }
-                    ],
-                    "safetySettings": [],
-                },
-                timeout=40,
-            )
+        url = f"{GEMINI_BASE_URL}/v1beta/models/{self.model}:generateContent?key={self.api_key}"
+        resp = await http_client.post(url, json=self._body(prompt), timeout=40)
         resp.raise_for_status()
         data = resp.json()
         cand = (data.get("candidates") or [{}])[0]
@@ -108,21 +199,25 @@ class GeminiClient(AIClient):
             return parts[0]["text"]
         return "\n".join(p.get("text", "") for p in parts)
 
-
-def _get_setting_value(session: Session, key: str) -> Optional[str]:
-    stmt = select(Setting).where(Setting.key == key)
-    setting = session.exec(stmt).first()
-    return setting.value if setting else None
-
-
-async def get_ai_client(session: Session) -> AIClient:
-    provider = _get_setting_value(session, "AI_PROVIDER") or "OPENAI"
-    enc_key = _get_setting_value(session, "AI_API_KEY")
-    if not enc_key:
+    async def stream_text(self, prompt: str) -> AsyncIterator[str]:
+        url = f"{GEMINI_BASE_URL}/v1beta/models/{self.model}:streamGenerateContent?alt=sse&key={self.api_key}"
+        async with http_client.stream("POST", url, json=self._body(prompt), timeout=STREAM_READ_TIMEOUT) as resp:
+            resp.raise_for_status()
+            async for data in _sse_data(resp):
+                cand = (json.loads(data).get("candidates") or [{}])[0]
+                for part in cand.get("content", {}).get("parts", []):
+                    if part.get("text"):
+                        yield part["text"]
+
+
+def _build_ai_client(settings: SettingsSnapshot) -> AIClient:
+    provider = settings.get("AI_PROVIDER") or "OPENAI"
+    if provider == "FAKE":
+        return FakeAIClient()
+    api_key = settings.get("AI_API_KEY")
+    if not api_key:
         raise RuntimeError("AI_API_KEY is not configured.")
 
-    api_key = decrypt_value(enc_key)
-
     if provider == "OPENAI":
         return OpenAIClient(api_key)
     if provider == "CLAUDE":
@@ -132,3 +227,7 @@ async def get_ai_client(session: Session) -> AIClient:
 
     raise RuntimeError(f"Unsupported AI provider: {provider}")
 
+
+async def get_ai_client(session: AsyncSession) -> AIClient:
+    """Client for the configured provider, built once per settings snapshot."""
+    return (await settings_snapshot(session)).client("ai", _build_ai_client)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from pydantic import TypeAdapter
+from sqlmodel import Session, select
+
+from ..models.portfolio import Article, Profile, Project, Testimonial
+from ..schemas.portfolio import ArticleRead, ProfileRead, ProjectRead, TestimonialRead
+from .cache_service import (
+    RESPONSE_CACHE_TTL_SECONDS,
+    CacheEntry,
+    add_invalidation_listener,
+    make_etag,
+)
+
+
+class BundleSection:
+    """One pre-serialized part of the bundle, rebuilt only when its tag is invalidated."""
+
+    def __init__(self, key: str, tag: str, adapter: TypeAdapter, load: Callable[[Session], Any]) -> None:
+        self.key = key
+        self.tag = tag
+        self.adapter = adapter
+        self.load = load
+        self.body: Optional[bytes] = None
+        self.built_at = 0.0
+
+    def is_stale(self, now: float) -> bool:
+        # The TTL bounds staleness for writes handled by another worker
+        return self.body is None or now - self.built_at >= RESPONSE_CACHE_TTL_SECONDS
+
+    def serialized(self, session: Session, now: float) -> bytes:
+        """The section's JSON, re-queried first if it is stale."""
+        body = self.body
+        if body is None or self.is_stale(now):
+            data = self.load(session)
+            body = self.adapter.dump_json(self.adapter.validate_python(data, from_attributes=True), by_alias=True)
+            self.body, self.built_at = body, now
+        return body
+
+
+class PublicBundle:
+    """
+    Homepage snapshot: profile, featured projects, testimonials and published
+    articles as one JSON object.
+
+    Each section keeps its serialized bytes; ``invalidate()`` on a tag only
+    marks the matching section dirty, and the next read re-queries that
+    section alone and splices the bytes together (no re-serialization of
+    the others). Between writes a read is a lock plus a dict lookup.
+    """
+
+    def __init__(self, sections: List[BundleSection]) -> None:
+        self.sections = sections
+        self._lock = threading.Lock()
+        self._entry: Optional[CacheEntry] = None
+
+    def on_invalidate(self, tags: tuple[str, ...]) -> None:
+        with self._lock:
+            for section in self.sections:
+                if section.tag in tags:
+                    section.body = None
+                    self._entry = None
+
+    def get(self, session: Session) -> CacheEntry:
+        now = time.monotonic()
+        with self._lock:
+            if self._entry is not None and not any(s.is_stale(now) for s in self.sections):
+                return self._entry
+            fragments = (b'"' + s.key.encode() + b'":' + s.serialized(session, now) for s in self.sections)
+            body = b"{" + b",".join(fragments) + b"}"
+            self._entry = CacheEntry(
+                body=body,
+                tags=frozenset(s.tag for s in self.sections),
+                expires_at=0.0,
+                etag=make_etag(body),
+            )
+            return self._entry
+
+
+def _load_profile(session: Session) -> Optional[Profile]:
+    # Same row as the public /profile view
+    return session.exec(select(Profile)).first()
+
+
+def _load_featured_projects(session: Session) -> Sequence[Project]:
+    return session.exec(select(Project).where(Project.is_featured == True)).all()
+
+
+def _load_testimonials(session: Session) -> Sequence[Testimonial]:
+    return session.exec(select(Testimonial)).all()
+
+
+def _load_published_articles(session: Session) -> Sequence[Article]:
+    return session.exec(select(Article).where(Article.published == True)).all()
+
+
+def new_public_bundle() -> PublicBundle:
+    """A bundle with its own, empty sections (e.g. for the static exporter)."""
+    return PublicBundle([
+        BundleSection("profile", "profile", TypeAdapter(Optional[ProfileRead]), _load_profile),
+        BundleSection("featuredProjects", "projects", TypeAdapter(List[ProjectRead]), _load_featured_projects),
+        BundleSection("testimonials", "testimonials", TypeAdapter(List[TestimonialRead]), _load_testimonials),
+        BundleSection("articles", "articles", TypeAdapter(List[ArticleRead]), _load_published_articles),
+    ])
+
+
+public_bundle = new_public_bundle()
+add_invalidation_listener(public_bundle.on_invalidate)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    tags: frozenset[str]
+    expires_at: float
+    headers: dict[str, str] = field(default_factory=dict)
+    etag: str = ""
+
+    def validators(self) -> dict[str, str]:
+        # No Last-Modified: the render time moves on every TTL refresh even
+        # when the content has not, and max(updated_at) misses deletions.
+        return {"ETag": self.etag}
+
+
+class ResponseCache:
+    """
+    Thread-safe in-process cache of serialized response bodies.
+
+    Entries expire after ``ttl_seconds``, the least recently used entry is
+    evicted once ``max_entries`` is reached, and every entry carries tags
+    so write handlers can drop everything derived from a table at once.
+    The TTL also bounds staleness when several workers run side by side,
+    since an invalidation only reaches the worker that handled the write.
+
+    Each tag also has a generation, bumped by ``invalidate()``: a body
+    rendered before an invalidation of one of its tags is not stored.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._by_tag: dict[str, set[str]] = {}
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def generations(self, tags: Iterable[str]) -> dict[str, int]:
+        """Current generation of each tag; pass it to ``set()`` to detect invalidations since."""
+        with self._lock:
+            return {tag: self._generations.get(tag, 0) for tag in tags}
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(
+        self,
+        key: str,
+        body: bytes,
+        tags: Iterable[str],
+        headers: Optional[dict[str, str]] = None,
+        generations: Optional[dict[str, int]] = None,
+    ) -> CacheEntry:
+        """
+        Store and return the entry. With ``generations`` (taken before the
+        render), the entry is returned but not stored if one of its tags was
+        invalidated in the meantime: the body may predate that write.
+        """
+        entry = CacheEntry(
+            body=body,
+            tags=frozenset(tags),
+            expires_at=time.monotonic() + self.ttl_seconds,
+            headers=headers or {},
+            etag=make_etag(body),
+        )
+        with self._lock:
+            if generations is not None and any(
+                self._generations.get(tag, 0) != generation for tag, generation in generations.items()
+            ):
+                return entry
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            for tag in entry.tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+        return entry
+
+    def invalidate(self, *tags: str) -> None:
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in self._by_tag.pop(tag, set()):
+                    self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+_invalidation_listeners: list[Callable[[tuple[str, ...]], None]] = []
+
+
+def make_etag(body: bytes) -> str:
+    """Strong validator derived from the response bytes, identical across workers."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/"x" matches "x"
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def is_not_modified(request: Request, entry: CacheEntry) -> bool:
+    """Evaluate If-None-Match against the entry's ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, entry.etag)
+    return False
+
+
+def invalidate(*tags: str) -> None:
+    """Drop every cached response carrying one of ``tags`` and notify listeners."""
+    response_cache.invalidate(*tags)
+    for listener in _invalidation_listeners:
+        listener(tags)
+
+
+def add_invalidation_listener(listener: Callable[[tuple[str, ...]], None]) -> None:
+    """Register a callback run on every ``invalidate()`` (e.g. precomputed bundles)."""
+    _invalidation_listeners.append(listener)
+
+
+def cache_key(request: Request, *extra: Any) -> str:
+    """Build a key from the route path, the sorted query string and any extra discriminators."""
+    query = urlencode(sorted(request.query_params.multi_items()))
+    key = f"{request.url.path}?{query}"
+    if extra:
+        key += "|" + "|".join(str(part) for part in extra)
+    return key
+
+
+def cached_json(
+    request: Request,
+    response: Response,
+    *,
+    tags: Iterable[str],
+    adapter: TypeAdapter,
+    render: Callable[[], Any],
+    key_extra: Iterable[Any] = (),
+) -> Response:
+    """
+    Serve a JSON body from the response cache, rendering it on a miss.
+
+    ``render`` runs the DB query and returns what the route would normally
+    return; it is serialized once with ``adapter`` (camelCase aliases, like
+    ``response_model``) and the bytes are kept together with any headers the
+    route set on ``response`` (e.g. the pagination cursor).
+
+    Every response carries a strong ``ETag``; conditional requests that
+    still match get an empty 304.
+    """
+    key = cache_key(request, *key_extra)
+    tags = tuple(tags)
+    entry = response_cache.get(key)
+    if entry is None:
+        # Taken before the query: a write invalidated during render() is not cached over
+        generations = response_cache.generations(tags)
+        data = render()
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True), by_alias=True)
+        entry = response_cache.set(key, body, tags, headers=dict(response.headers), generations=generations)
+    headers = {**entry.headers, **entry.validators()}
+    if is_not_modified(request, entry):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
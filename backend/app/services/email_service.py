@@ -1,13 +1,8 @@
 from __future__ import annotations
 
-import os
-from typing import Optional
-
-import httpx
-
-from ..core.encryption import decrypt_value
-from ..models.portfolio import Setting
-from sqlmodel import Session, select
+from . import http_client
+from .settings_service import SettingsSnapshot, settings_snapshot
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 
 class EmailClient:
@@ -26,18 +21,17 @@ class ResendEmailClient(EmailClient):
         self.default_from = default_from
 
     async def send_email(self, to: str, subject: str, html: str) -> None:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                "https://api.resend.com/emails",
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                json={
-                    "from": self.default_from,
-                    "to": to,
-                    "subject": subject,
-                    "html": html,
-                },
-                timeout=20,
-            )
+        resp = await http_client.post(
+            "https://api.resend.com/emails",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={
+                "from": self.default_from,
+                "to": to,
+                "subject": subject,
+                "html": html,
+            },
+            timeout=20,
+        )
         resp.raise_for_status()
 
 
@@ -47,34 +41,31 @@ class SendGridEmailClient(EmailClient):
         self.default_from = default_from
 
     async def send_email(self, to: str, subject: str, html: str) -> None:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                "https://api.sendgrid.com/v3/mail/send",
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "personalizations": [{"to": [{"email": to}]}],
-                    "from": {"email": self.default_from},
-                    "subject": subject,
-                    "content": [{"type": "text/html", "value": html}],
-                },
-                timeout=20,
-            )
+        resp = await http_client.post(
+            "https://api.sendgrid.com/v3/mail/send",
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+            },
+            json={
+                "personalizations": [{"to": [{"email": to}]}],
+                "from": {"email": self.default_from},
+                "subject": subject,
+                "content": [{"type": "text/html", "value": html}],
+            },
+            timeout=20,
+        )
         resp.raise_for_status()
 
 
-async def get_email_client(session: Session) -> EmailClient:
-    provider = _get_setting_value(session, "EMAIL_PROVIDER")
-    enc_key = _get_setting_value(session, "EMAIL_API_KEY")
-    notification_email = _get_setting_value(session, "NOTIFICATION_EMAIL")
+def _build_email_client(settings: SettingsSnapshot) -> EmailClient:
+    provider = settings.get("EMAIL_PROVIDER")
+    api_key = settings.get("EMAIL_API_KEY")
+    notification_email = settings.get("NOTIFICATION_EMAIL")
 
-    if not provider or provider == "NONE" or not enc_key or not notification_email:
+    if not provider or provider == "NONE" or not api_key or not notification_email:
         return NoopEmailClient()
 
-    api_key = decrypt_value(enc_key)
-
     if provider == "RESEND":
         return ResendEmailClient(api_key, notification_email)
     if provider == "SENDGRID":
@@ -83,8 +74,6 @@ async def get_email_client(session: Session) -> EmailClient:
     return NoopEmailClient()
 
 
-def _get_setting_value(session: Session, key: str) -> Optional[str]:
-    stmt = select(Setting).where(Setting.key == key)
-    setting = session.exec(stmt).first()
-    return setting.value if setting else None
-
+async def get_email_client(session: AsyncSession) -> EmailClient:
+    """Client for the configured provider, built once per settings snapshot."""
+    return (await settings_snapshot(session)).client("email", _build_email_client)
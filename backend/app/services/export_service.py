@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import TypeAdapter
+from sqlmodel import Session, col, delete, func, or_, select
+
+from ..models.portfolio import Article, ArticleTagCount, ContentChange, Profile, Project, Testimonial
+from ..schemas.portfolio import ArticleRead, ProfileRead, ProjectRead, TagCount, TestimonialRead
+
+try:  # .br files are only written when the brotli package is installed
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+STATE_FILE = ".export-state.json"
+DEFAULT_PAGE_SIZE = 20
+# Consumed change-log rows are kept this long, for other exporters / debugging
+CHANGE_LOG_RETENTION = timedelta(days=7)
+# Change ids are taken at flush time, not commit time: an id below the last
+# one exported may still commit. Such gaps are re-read on every run until
+# they show up or are this old (the transaction rolled back).
+PENDING_CHANGE_TIMEOUT = timedelta(hours=1)
+
+_PROFILE = TypeAdapter(Optional[ProfileRead])
+_PROJECT = TypeAdapter(ProjectRead)
+_PROJECTS = TypeAdapter(List[ProjectRead])
+_ARTICLE = TypeAdapter(ArticleRead)
+_ARTICLES = TypeAdapter(List[ArticleRead])
+_TESTIMONIALS = TypeAdapter(List[TestimonialRead])
+_TAGS = TypeAdapter(List[TagCount])
+
+
+@dataclass
+class ExportReport:
+    mode: str
+    written: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    changes: int = 0
+
+
+@dataclass
+class ChangeSet:
+    """Entities to regenerate, from the change log plus rows created since the last export."""
+    updated: Dict[str, Set[str]] = field(default_factory=dict)
+    deleted: Dict[str, Set[str]] = field(default_factory=dict)
+    old_slugs: Dict[str, Set[str]] = field(default_factory=dict)
+    last_change_id: int = 0
+    # Unseen ids below last_change_id -> when they were first missed (ISO)
+    pending_ids: Dict[int, str] = field(default_factory=dict)
+
+    def touches(self, entity: str) -> bool:
+        return bool(self.updated.get(entity) or self.deleted.get(entity))
+
+
+class StaticExporter:
+    """
+    Render the public read endpoints to ``<out>/<route>/index.json`` (plus
+    ``.gz`` / ``.br`` siblings), e.g. ``projects/slug/my-app/index.json``.
+    Query-string variants get a path of their own: ``/projects?featured=true``
+    is ``projects/featured/``, list pages are ``<list>/page/<n>/``.
+
+    Files are only rewritten when their bytes change, so an rsync / CDN
+    upload after an incremental run only ships what changed.
+    """
+
+    def __init__(self, session: Session, out_dir: str, page_size: int = DEFAULT_PAGE_SIZE) -> None:
+        self.session = session
+        self.out_dir = out_dir
+        self.page_size = page_size
+        self.report = ExportReport(mode="full")
+        self._produced: Set[str] = set()
+
+    # ── Entry points ─────────────────────────────────────────────────────────
+
+    def export_full(self) -> ExportReport:
+        self.report = ExportReport(mode="full")
+        last_change_id, pending_ids = self._recent_gaps()
+        self._render_profile()
+        self._render_project_lists()
+        for project in self.session.exec(select(Project)).all():
+            self._render_project(project)
+        self._render_article_lists()
+        for article in self.session.exec(_public_articles()).all():
+            self._render_article(article)
+        self._render_testimonials()
+        self._render_bundle()
+        self._prune_unproduced()
+        self._save_state(last_change_id, pending_ids)
+        return self.report
+
+    def export_incremental(self) -> ExportReport:
+        state = self._load_state()
+        if state is None:
+            return self.export_full()
+        self.report = ExportReport(mode="incremental")
+        changes = self._collect_changes(state)
+        self.report.changes = sum(len(ids) for ids in (*changes.updated.values(), *changes.deleted.values()))
+
+        if changes.touches("profile"):
+            self._render_profile()
+        if changes.touches("project"):
+            self._render_project_lists()
+            self._update_details("project", changes)
+        if changes.touches("article"):
+            self._render_article_lists()
+            self._update_details("article", changes)
+        if changes.touches("testimonial"):
+            self._render_testimonials()
+        if self.report.changes:
+            self._render_bundle()
+
+        self._save_state(changes.last_change_id, changes.pending_ids)
+        self._prune_change_log(changes.last_change_id)
+        return self.report
+
+    # ── Change detection ─────────────────────────────────────────────────────
+
+    def _collect_changes(self, state: Dict[str, Any]) -> ChangeSet:
+        high_water = state["last_change_id"]
+        pending = {int(i): since for i, since in state.get("pending_ids", {}).items()}
+        changes = ChangeSet(last_change_id=high_water)
+        seen: Set[int] = set()
+        for change in self.session.exec(
+            select(ContentChange)
+            .where(or_(col(ContentChange.id) > high_water, col(ContentChange.id).in_(list(pending))))
+            .order_by(col(ContentChange.id))
+        ):
+            target = changes.deleted if change.deleted else changes.updated
+            target.setdefault(change.entity, set()).add(change.entity_id)
+            if change.previous_slug:
+                changes.old_slugs.setdefault(change.entity, set()).add(change.previous_slug)
+            change_id = change.id or 0
+            seen.add(change_id)
+            changes.last_change_id = max(changes.last_change_id, change_id)
+        changes.pending_ids = _pending_gaps(pending, seen, high_water, changes.last_change_id)
+
+        # Rows inserted outside the ORM (SQL scripts) never reach the log
+        exported_at = datetime.fromisoformat(state["exported_at"])
+        created = (
+            ("project", select(Project.id).where(col(Project.created_at) > exported_at)),
+            ("article", select(Article.id).where(col(Article.created_at) > exported_at)),
+        )
+        for entity, statement in created:
+            for row_id in self.session.exec(statement).all():
+                changes.updated.setdefault(entity, set()).add(str(row_id))
+        return changes
+
+    def _update_details(self, entity: str, changes: ChangeSet) -> None:
+        base = "projects" if entity == "project" else "articles"
+        updated = changes.updated.get(entity, set()) - changes.deleted.get(entity, set())
+        ids = _uuids(updated)
+
+        rendered: Set[str] = set()
+        live_slugs: Set[str] = set()
+        if entity == "project":
+            projects = self.session.exec(select(Project).where(col(Project.id).in_(ids))).all() if ids else []
+            for project in projects:
+                self._render_project(project)
+                rendered.add(str(project.id))
+                live_slugs.add(project.slug)
+        else:
+            articles = self.session.exec(select(Article).where(col(Article.id).in_(ids))).all() if ids else []
+            for article in articles:
+                rendered.add(str(article.id))
+                if not article.published:
+                    # Unpublished since the last export: its page must disappear
+                    self._remove(f"{base}/{article.id}")
+                    continue
+                self._render_article(article)
+        for row_id in changes.deleted.get(entity, set()) | (updated - rendered):
+            self._remove(f"{base}/{row_id}")
+        if entity == "project":
+            old_slugs = changes.old_slugs.get(entity, set())
+            current = set(self.session.exec(select(Project.slug).where(col(Project.slug).in_(old_slugs))).all())
+            for slug in old_slugs - current - live_slugs:
+                self._remove(f"projects/slug/{slug}")
+
+    # ── Renderers ────────────────────────────────────────────────────────────
+
+    def _render_profile(self) -> None:
+        self._write("profile", _PROFILE, self.session.exec(select(Profile)).first())
+
+    def _render_project_lists(self) -> None:
+        # Unpaged lists keep the API's (unordered) query so the bytes match it
+        projects = self.session.exec(select(Project)).all()
+        self._write("projects", _PROJECTS, projects)
+        self._write("projects/featured", _PROJECTS, [p for p in projects if p.is_featured])
+        # Pages follow the ?limit= keyset order, newest first
+        pages = sorted(projects, key=lambda p: (p.created_at, p.id), reverse=True)
+        self._write_pages("projects", _PROJECTS, pages)
+
+    def _render_project(self, project: Project) -> None:
+        self._write(f"projects/{project.id}", _PROJECT, project)
+        self._write(f"projects/slug/{project.slug}", _PROJECT, project)
+
+    def _render_article_lists(self) -> None:
+        articles = self.session.exec(_public_articles()).all()
+        self._write("articles", _ARTICLES, articles)
+        pages = sorted(articles, key=lambda a: (a.published_at or a.created_at, a.id), reverse=True)
+        self._write_pages("articles", _ARTICLES, pages)
+        tags = self.session.exec(
+            select(ArticleTagCount).order_by(col(ArticleTagCount.count).desc(), col(ArticleTagCount.tag))
+        ).all()
+        self._write("articles/tags", _TAGS, tags)
+
+    def _render_article(self, article: Article) -> None:
+        self._write(f"articles/{article.id}", _ARTICLE, article)
+
+    def _render_testimonials(self) -> None:
+        testimonials = self.session.exec(select(Testimonial)).all()
+        self._write("testimonials", _TESTIMONIALS, testimonials)
+        self._write_pages("testimonials", _TESTIMONIALS, sorted(testimonials, key=lambda t: t.id, reverse=True))
+
+    def _render_bundle(self) -> None:
+        from .bundle_service import new_public_bundle
+
+        # Same bytes as GET /public/bundle, built from this session without
+        # touching the live bundle of the process it runs in
+        self._write_bytes("public/bundle", new_public_bundle().get(self.session).body)
+
+    def _write_pages(self, route: str, adapter: TypeAdapter, rows: List[Any]) -> None:
+        pages = max(1, -(-len(rows) // self.page_size))
+        for number in range(1, pages + 1):
+            start = (number - 1) * self.page_size
+            self._write(f"{route}/page/{number}", adapter, rows[start:start + self.page_size])
+        # Pages past the end (the list shrank)
+        number = pages + 1
+        while os.path.isdir(os.path.join(self.out_dir, route, "page", str(number))):
+            self._remove(f"{route}/page/{number}")
+            number += 1
+
+    # ── Files ────────────────────────────────────────────────────────────────
+
+    def _write(self, route: str, adapter: TypeAdapter, data: Any) -> None:
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True), by_alias=True)
+        self._write_bytes(route, body)
+
+    def _write_bytes(self, route: str, body: bytes) -> None:
+        directory = os.path.join(self.out_dir, *route.split("/"))
+        path = os.path.join(directory, "index.json")
+        self._produced.add(os.path.normpath(directory))
+        if _read(path) == body:
+            self.report.unchanged += 1
+            return
+        os.makedirs(directory, exist_ok=True)
+        _atomic_write(path, body)
+        _atomic_write(path + ".gz", gzip.compress(body, compresslevel=9, mtime=0))
+        if brotli is not None:
+            _atomic_write(path + ".br", brotli.compress(body, quality=9))
+        self.report.written += 1
+
+    def _remove(self, route: str) -> None:
+        directory = os.path.join(self.out_dir, *route.split("/"))
+        if os.path.isdir(directory):
+            shutil.rmtree(directory)
+            self.report.removed += 1
+
+    def _prune_unproduced(self) -> None:
+        """After a full export, drop pages of entities that no longer exist."""
+        for root, _dirs, files in os.walk(self.out_dir, topdown=False):
+            if "index.json" in files and os.path.normpath(root) not in self._produced:
+                for name in files:
+                    if name.startswith("index.json"):
+                        os.remove(os.path.join(root, name))
+                self.report.removed += 1
+            if root != self.out_dir and not os.listdir(root):
+                os.rmdir(root)
+
+    # ── State & change log ───────────────────────────────────────────────────
+
+    def _recent_gaps(self) -> Tuple[int, Dict[int, str]]:
+        """Highest change id, and the ids missing among the recent ones (possibly still in flight)."""
+        recent = self.session.exec(
+            select(col(ContentChange.id)).where(
+                col(ContentChange.changed_at) > datetime.utcnow() - PENDING_CHANGE_TIMEOUT
+            )
+        ).all()
+        last_change_id = self.session.exec(select(func.max(ContentChange.id))).first() or 0
+        ids = {i for i in recent if i is not None}
+        if not ids:
+            return last_change_id, {}
+        return last_change_id, _pending_gaps({}, ids, min(ids) - 1, last_change_id)
+
+    def _load_state(self) -> Optional[Dict[str, Any]]:
+        raw = _read(os.path.join(self.out_dir, STATE_FILE))
+        return json.loads(raw) if raw else None
+
+    def _save_state(self, last_change_id: int, pending_ids: Dict[int, str]) -> None:
+        os.makedirs(self.out_dir, exist_ok=True)
+        state = {
+            "last_change_id": last_change_id,
+            "pending_ids": {str(i): since for i, since in pending_ids.items()},
+            "exported_at": datetime.utcnow().isoformat(),
+        }
+        _atomic_write(os.path.join(self.out_dir, STATE_FILE), json.dumps(state).encode())
+
+    def _prune_change_log(self, last_change_id: int) -> None:
+        self.session.exec(
+            delete(ContentChange).where(
+                col(ContentChange.id) <= last_change_id,
+                col(ContentChange.changed_at) < datetime.utcnow() - CHANGE_LOG_RETENTION,
+            )
+        )
+        self.session.commit()
+
+
+def _public_articles():
+    # Same set as /articles?published_only=true; drafts are never exported
+    return select(Article).where(Article.published == True)
+
+
+def _pending_gaps(pending: Dict[int, str], seen: Set[int], low: int, high: int) -> Dict[int, str]:
+    """
+    Ids still awaited after a run: the previous pending ones not seen yet,
+    plus every id in (low, high] that did not show up, until they expire.
+    """
+    now = datetime.utcnow()
+    expired = (now - PENDING_CHANGE_TIMEOUT).isoformat()
+    gaps = {i: since for i, since in pending.items() if i not in seen and since > expired}
+    for i in range(low + 1, high + 1):
+        if i not in seen and i not in gaps:
+            gaps[i] = now.isoformat()
+    return gaps
+
+
+def _uuids(ids: Iterable[str]) -> List[uuid.UUID]:
+    # Project and Article ids are UUIDs; the change log stores them as text
+    return [uuid.UUID(i) for i in ids]
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    partial = path + ".part"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
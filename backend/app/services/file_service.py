@@ -1,20 +1,87 @@
+import hashlib
 import os
-import shutil
-from fastapi import UploadFile
+import uuid
+from dataclasses import dataclass
 from typing import Optional
 
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
 UPLOAD_DIR = "uploads"
+# Bytes read from the upload and written to disk per step
+CHUNK_SIZE = 64 * 1024
 
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
+
+class UploadTooLarge(Exception):
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"Upload exceeds {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+@dataclass(frozen=True)
+class StoredUpload:
+    path: str
+    size_bytes: int
+    sha256: str
+
+
+async def stream_upload_to_file(
+    upload_file: UploadFile,
+    destination: str,
+    max_bytes: Optional[int] = None,
+) -> StoredUpload:
+    """
+    Copy ``upload_file`` to ``destination`` chunk by chunk.
+
+    Memory stays at one chunk per upload whatever the file size. Disk writes
+    run in the threadpool so the event loop is never blocked. The SHA-256 is
+    computed in the same pass. The data goes to a ``.part`` file that is
+    renamed only once complete, and copying stops as soon as ``max_bytes``
+    is exceeded (UploadTooLarge, nothing left on disk).
+
+    By then Starlette has already received and spooled the whole multipart
+    body: this check only guards the stored file. Rejecting an oversized
+    request before it is read is BodySizeLimitMiddleware's job.
+    """
+    if max_bytes is not None and upload_file.size is not None and upload_file.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    partial = f"{destination}.{uuid.uuid4().hex}.part"
+    hasher = hashlib.sha256()
+    size = 0
+    buffer = await run_in_threadpool(open, partial, "wb")
+    try:
+        while chunk := await upload_file.read(CHUNK_SIZE):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            hasher.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(os.replace, partial, destination)
+    except BaseException:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(_remove_quietly, partial)
+        raise
+    return StoredUpload(path=destination, size_bytes=size, sha256=hasher.hexdigest())
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
 async def save_upload_file(upload_file: UploadFile, subfolder: str = "") -> str:
     folder_path = os.path.join(UPLOAD_DIR, subfolder)
     if not os.path.exists(folder_path):
         os.makedirs(folder_path)
-    
+
     file_path = os.path.join(folder_path, upload_file.filename)
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(upload_file.file, buffer)
-    
+    await stream_upload_to_file(upload_file, file_path)
+
     return f"/{UPLOAD_DIR}/{subfolder}/{upload_file.filename}".replace("//", "/")
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# Pool sizing and defaults for every outbound call (AI, email, revalidation)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "true").lower() in ("1", "true", "yes")
+
+_client: Optional[httpx.AsyncClient] = None
+_host_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (installed with httpx[http2])
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_ENABLED and _http2_available(),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    )
+
+
+async def start_http_client() -> None:
+    """Open the shared client (called from the app lifespan)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+
+
+async def stop_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+    _client = None
+    _host_slots.clear()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client. Outside the lifespan (scripts, tests) it is
+    created lazily on first use.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+def _host_slot(url: str) -> asyncio.Semaphore:
+    # httpx only caps the pool as a whole; this keeps one slow provider
+    # from holding every connection.
+    host = urlsplit(url).netloc
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = _host_slots[host] = asyncio.Semaphore(HTTP_MAX_PER_HOST)
+    return slot
+
+
+def _with_timeout(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    timeout = kwargs.get("timeout")
+    if isinstance(timeout, (int, float)):
+        # A bare number is the overall budget; keep the short connect timeout
+        kwargs["timeout"] = httpx.Timeout(timeout, connect=min(timeout, HTTP_CONNECT_TIMEOUT))
+    return kwargs
+
+
+async def request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """Send a request through the shared pool, at most HTTP_MAX_PER_HOST at a time per host."""
+    async with _host_slot(url):
+        return await get_http_client().request(method, url, **_with_timeout(kwargs))
+
+
+@asynccontextmanager
+async def stream(method: str, url: str, **kwargs: Any) -> AsyncIterator[httpx.Response]:
+    """
+    Streaming variant of request(): the body is read as it arrives. The
+    host slot is held until the block exits. With streaming a numeric
+    timeout bounds each read (gap between chunks), not the whole body.
+    """
+    async with _host_slot(url):
+        async with get_http_client().stream(method, url, **_with_timeout(kwargs)) as response:
+            yield response
+
+
+async def post(url: str, **kwargs: Any) -> httpx.Response:
+    return await request("POST", url, **kwargs)
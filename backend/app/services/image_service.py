@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from .file_service import UPLOAD_DIR
+
+try:  # Pillow is optional: without it uploads are served as-is
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+IMAGE_VARIANT_WIDTHS = sorted(
+    int(w) for w in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1024,1600").split(",") if w.strip()
+)
+IMAGE_VARIANT_FORMATS = [
+    f.strip() for f in os.getenv("IMAGE_VARIANT_FORMATS", "avif,webp").split(",") if f.strip()
+]
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+IMAGE_QUALITY = {"webp": 80, "avif": 60, "jpeg": 82}
+
+DERIVED_DIR = os.path.join(UPLOAD_DIR, "derived")
+# Raster types worth resizing; SVG is vector and GIF may be animated
+RESIZABLE_TYPES = {"image/jpeg", "image/png", "image/webp"}
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pending: Set[asyncio.Task] = set()
+
+
+def supported_formats() -> List[str]:
+    if Image is None:
+        return []
+    return [f for f in IMAGE_VARIANT_FORMATS if f == "jpeg" or features.check(f)]
+
+
+def start_image_pool() -> None:
+    """Start the resize workers (called from the app lifespan)."""
+    global _pool
+    if _pool is None and Image is not None:
+        _pool = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+
+
+def stop_image_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+async def _run_in_pool(fn, *args):
+    if _pool is None:
+        # Outside the lifespan (scripts): resize in a thread instead
+        return await run_in_threadpool(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(_pool, fn, *args)
+
+
+# ── Paths ───────────────────────────────────────────────────────────────────
+
+def source_path(url: str) -> Optional[str]:
+    """Disk path of an ``/uploads/…`` URL, or None if it escapes the uploads dir."""
+    if not url.startswith("/uploads/"):
+        return None
+    relative = url[len("/uploads/"):]
+    if relative.startswith("derived/"):
+        return None
+    root = os.path.realpath(UPLOAD_DIR)
+    path = os.path.realpath(os.path.join(root, *relative.split("/")))
+    if not path.startswith(root + os.sep):
+        return None
+    return path
+
+
+def variant_path(url: str, width: int, fmt: str) -> str:
+    """
+    uploads/derived/<source path>/w<width>.<fmt>. The source extension stays
+    in the directory name: foo.png and foo.jpg are different images.
+    """
+    relative = url[len("/uploads/"):]
+    return os.path.join(DERIVED_DIR, *relative.split("/"), f"w{width}.{fmt}")
+
+
+def snap_width(width: int) -> int:
+    """Round a requested width up to a configured one, so the cache stays bounded."""
+    for candidate in IMAGE_VARIANT_WIDTHS:
+        if candidate >= width:
+            return candidate
+    return IMAGE_VARIANT_WIDTHS[-1]
+
+
+# ── Work done in the process pool ───────────────────────────────────────────
+
+def _pillow():
+    # Work is only submitted to the pool when the import succeeded
+    if Image is None:
+        raise RuntimeError("Pillow is not installed")
+    return Image
+
+
+def _open_upright(path: str):
+    image = _pillow().open(path)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode == "LA" or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    return image
+
+
+def _save(image, dest: str, fmt: str) -> None:
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    partial = f"{dest}.{uuid.uuid4().hex}.part"
+    if fmt == "jpeg" and image.mode == "RGBA":
+        image = image.convert("RGB")
+    image.save(partial, format=fmt.upper(), quality=IMAGE_QUALITY.get(fmt, 80))
+    os.replace(partial, dest)
+
+
+def _resized(image, width: int):
+    if image.width <= width:
+        return image
+    height = round(image.height * width / image.width)
+    return image.resize((width, height), _pillow().Resampling.LANCZOS)
+
+
+def render_variants(source: str, targets: List[Tuple[int, str, str]]) -> int:
+    """Decode ``source`` once and write every (width, format, dest) missing on disk."""
+    todo = [t for t in targets if not os.path.exists(t[2])]
+    if not todo:
+        return 0
+    image = _open_upright(source)
+    for width in sorted({w for w, _, _ in todo}, reverse=True):
+        resized = _resized(image, width)
+        for w, fmt, dest in todo:
+            if w == width:
+                _save(resized, dest, fmt)
+    return len(todo)
+
+
+def probe_dimensions(source: str) -> Tuple[int, int]:
+    with _pillow().open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        return image.width, image.height
+
+
+# ── Async API ───────────────────────────────────────────────────────────────
+
+def _widths_for(original_width: int) -> List[Tuple[int, int]]:
+    """(variant width, actual pixel width) pairs; images are never upscaled."""
+    pairs = [(w, w) for w in IMAGE_VARIANT_WIDTHS if w < original_width]
+    largest = snap_width(original_width)
+    return pairs + [(largest, min(original_width, largest))]
+
+
+async def build_srcset(url: str, content_type: str) -> Optional[Dict[str, Any]]:
+    """
+    Describe the variants of ``url`` for a <picture> element and queue their
+    generation in the background. Returns None for files that are not resized.
+    """
+    path = source_path(url)
+    if Image is None or content_type not in RESIZABLE_TYPES or path is None:
+        return None
+    try:
+        width, height = await run_in_threadpool(probe_dimensions, path)
+    except Exception:
+        logger.exception("Could not read image %s", url)
+        return None
+
+    widths = _widths_for(width)
+    formats = supported_formats()
+    schedule_variants(url, path, [(w, f) for w, _ in widths for f in formats])
+    return {
+        "src": url,
+        "width": width,
+        "height": height,
+        "sources": [
+            {
+                "type": MIME_TYPES[fmt],
+                "srcset": ", ".join(f"{variant_url(url, w, fmt)} {px}w" for w, px in widths),
+            }
+            for fmt in formats
+        ],
+    }
+
+
+def variant_url(url: str, width: int, fmt: str) -> str:
+    return f"/media/variants/w{width}.{fmt}{url}"
+
+
+def schedule_variants(url: str, path: str, specs: List[Tuple[int, str]]) -> None:
+    """Generate the variants off the request path; failures are only logged."""
+    targets = [(w, f, variant_path(url, w, f)) for w, f in specs]
+
+    async def run() -> None:
+        try:
+            await _run_in_pool(render_variants, path, targets)
+        except Exception:
+            logger.exception("Image variants failed for %s", url)
+
+    task = asyncio.get_running_loop().create_task(run())
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def ensure_variant(url: str, width: int, fmt: str) -> Optional[str]:
+    """Disk path of the variant, rendering it now if it is not cached yet."""
+    path = source_path(url)
+    if Image is None or path is None or not os.path.isfile(path):
+        return None
+    dest = variant_path(url, width, fmt)
+    if not os.path.exists(dest):
+        await _run_in_pool(render_variants, path, [(width, fmt, dest)])
+    return dest
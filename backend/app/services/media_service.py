@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple, cast
+
+from fastapi import UploadFile
+from sqlalchemy import CursorResult, delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ..core.static_files import is_compressible, precompress_file
+from ..models.portfolio import Article, MediaAsset, Profile, Project, Testimonial, table_of
+from .file_service import UPLOAD_DIR, stream_upload_to_file
+
+# uploads/cas/ab/cd/abcd….ext — two levels of sharding keep directories small
+CAS_DIR = os.path.join(UPLOAD_DIR, "cas")
+CAS_TMP_DIR = os.path.join(CAS_DIR, "tmp")
+URL_PREFIX = "/uploads/"
+
+
+def cas_relative_path(sha256: str, ext: str) -> str:
+    return f"cas/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def _disk_path(relative: str) -> str:
+    return os.path.join(UPLOAD_DIR, *relative.split("/"))
+
+
+def normalize_media_url(value: Optional[str]) -> Optional[str]:
+    """Reduce absolute or relative media URLs to their ``/uploads/…`` path."""
+    if not value:
+        return None
+    index = value.find(URL_PREFIX)
+    if index == -1:
+        return None
+    return value[index:].split("?", 1)[0].split("#", 1)[0]
+
+
+@dataclass(frozen=True)
+class StoredAsset:
+    asset: MediaAsset
+    deduplicated: bool
+
+
+async def store_upload(
+    session: AsyncSession,
+    upload_file: UploadFile,
+    ext: str,
+    max_bytes: Optional[int] = None,
+) -> StoredAsset:
+    """
+    Stream ``upload_file`` into the content-addressed store.
+
+    The file is hashed while it is written to a temp file, then moved to its
+    SHA-256 path. Identical uploads share one file, one MediaAsset and one
+    URL; re-uploading an existing blob marks its row as freshly referenced,
+    so the GC grace period starts again.
+
+    The row is committed before the blob is put in place, and the blob is
+    always (re)written: collect_garbage moves a blob aside and only deletes
+    it if no row exists afterwards, so the two never lose each other's work.
+    """
+    await run_in_threadpool(os.makedirs, CAS_TMP_DIR, exist_ok=True)
+    temp_path = os.path.join(CAS_TMP_DIR, f"{uuid.uuid4().hex}{ext}")
+    stored = await stream_upload_to_file(upload_file, temp_path, max_bytes)
+
+    relative = cas_relative_path(stored.sha256, ext)
+    try:
+        asset, deduplicated = await _commit_asset(
+            session, stored.sha256, f"{URL_PREFIX}{relative}",
+            upload_file.content_type or "application/octet-stream", stored.size_bytes,
+        )
+    except BaseException:
+        await run_in_threadpool(_remove_file, temp_path)
+        raise
+
+    target = _disk_path(asset.url[len(URL_PREFIX):])
+    await run_in_threadpool(_move_into_store, temp_path, target)
+    if is_compressible(target):
+        # SVG: .br/.gz siblings ready before the first request (no-op when fresh)
+        await run_in_threadpool(precompress_file, target)
+    return StoredAsset(asset, deduplicated)
+
+
+async def _commit_asset(
+    session: AsyncSession, sha256: str, url: str, content_type: str, size_bytes: int
+) -> Tuple[MediaAsset, bool]:
+    """Insert the row, or mark the existing one as just referenced. Returns (asset, deduplicated)."""
+    table = table_of(MediaAsset)
+    touched = cast(CursorResult, await session.execute(
+        update(table).where(table.c.sha256 == sha256).values(last_referenced_at=datetime.utcnow())
+    )).rowcount
+    deduplicated = bool(touched)
+    if not deduplicated:
+        session.add(MediaAsset(sha256=sha256, url=url, content_type=content_type, size_bytes=size_bytes))
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Same content uploaded concurrently: the other request's row wins
+        await session.rollback()
+        deduplicated = True
+    asset = await session.get(MediaAsset, sha256, populate_existing=True)
+    if asset is None:
+        # Committed above (ours or the concurrent upload's) and only deleted by
+        # collect_garbage once older than its grace period
+        raise RuntimeError(f"MediaAsset {sha256} vanished right after its commit")
+    return asset, deduplicated
+
+
+def _move_into_store(temp_path: str, target: str) -> None:
+    # Identical bytes: replacing an existing blob is harmless and revives one
+    # the GC may just have moved aside
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    os.replace(temp_path, target)
+
+
+# ── References & garbage collection ─────────────────────────────────────────
+
+def _project_urls(project: Project) -> Iterable[Optional[str]]:
+    yield project.main_image
+    yield from project.screenshots or []
+    for person in project.interveners or []:
+        if isinstance(person, dict):
+            yield person.get("avatar")
+
+
+def referenced_media_urls(session: Session) -> Counter:
+    """Number of references to each ``/uploads/…`` URL across content rows."""
+    raw: List[Optional[str]] = []
+    for project in session.exec(select(Project)):
+        raw.extend(_project_urls(project))
+    raw.extend(session.exec(select(Article.cover_image)))
+    raw.extend(session.exec(select(Testimonial.image_url)))
+    for image, cv in session.exec(select(Profile.profile_image_url, Profile.cv_url)):
+        raw.extend((image, cv))
+    return Counter(url for url in map(normalize_media_url, raw) if url)
+
+
+@dataclass
+class GarbageReport:
+    scanned_assets: int = 0
+    referenced_assets: int = 0
+    deleted_assets: int = 0
+    deleted_orphan_files: int = 0
+    freed_bytes: int = 0
+
+
+def collect_garbage(session: Session, grace: timedelta, dry_run: bool = False) -> GarbageReport:
+    """
+    Snapshot MediaAsset.gc_reference_count and delete blobs nobody references.
+
+    Assets created or (re)uploaded less than ``grace`` ago are kept even when
+    unreferenced: they may belong to a form that is not saved yet. Files
+    under cas/ with no MediaAsset row (e.g. a crash between write and
+    commit) are removed under the same rule.
+
+    A row is only deleted if nothing touched it since the scan, and its
+    files are only unlinked after that commit, through _discard_blob, which
+    puts them back if an upload of the same content recreated the row.
+    """
+    now = datetime.utcnow()
+    cutoff = now - grace
+    referenced = referenced_media_urls(session)
+    report = GarbageReport()
+    candidates: List[MediaAsset] = []
+
+    known_files = set()
+    for asset in session.exec(select(MediaAsset)).all():
+        report.scanned_assets += 1
+        known_files.add(os.path.normpath(_disk_path(asset.url[len(URL_PREFIX):])))
+        if asset.url in referenced:
+            report.referenced_assets += 1
+            asset.gc_reference_count = referenced[asset.url]
+            asset.last_referenced_at = now
+            session.add(asset)
+            continue
+        asset.gc_reference_count = 0
+        session.add(asset)
+        if max(asset.created_at, asset.last_referenced_at or asset.created_at) <= cutoff:
+            candidates.append(asset)
+
+    orphans = []
+    for path in _stored_files():
+        # .br / .gz siblings belong to their source file
+        if os.path.normpath(path) in known_files or os.path.normpath(os.path.splitext(path)[0]) in known_files:
+            continue
+        if datetime.utcfromtimestamp(os.path.getmtime(path)) > cutoff:
+            continue
+        orphans.append(path)
+
+    if dry_run:
+        report.deleted_assets = len(candidates)
+        report.freed_bytes = sum(a.size_bytes for a in candidates) + sum(map(os.path.getsize, orphans))
+        report.deleted_orphan_files = len(orphans)
+        session.rollback()
+        return report
+
+    table = table_of(MediaAsset)
+    deleted: List[Tuple[str, str, int]] = []
+    for asset in candidates:
+        # Conditional: an upload of the same content since the scan bumped last_referenced_at
+        gone = cast(CursorResult, session.execute(
+            delete(table).where(
+                table.c.sha256 == asset.sha256,
+                table.c.created_at <= cutoff,
+                or_(table.c.last_referenced_at.is_(None), table.c.last_referenced_at <= cutoff),
+            )
+        )).rowcount
+        if gone:
+            report.deleted_assets += 1
+            deleted.append((asset.sha256, asset.url, asset.size_bytes))
+    session.commit()
+
+    for sha256, url, size in deleted:
+        if _discard_blob(session, sha256, _disk_path(url[len(URL_PREFIX):])):
+            report.freed_bytes += size
+            _remove_variants(url)
+    for path in orphans:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if path.endswith(".gc"):
+            # Set aside by an interrupted run
+            _remove_file(path)
+            discarded = True
+        else:
+            discarded = _discard_blob(session, os.path.basename(path).split(".", 1)[0], path)
+        if discarded:
+            report.deleted_orphan_files += 1
+            report.freed_bytes += size
+    return report
+
+
+def _discard_blob(session: Session, sha256: str, path: str) -> bool:
+    """
+    Delete ``path`` (and its .br/.gz siblings) unless a MediaAsset row for
+    ``sha256`` exists once they are out of the way. store_upload commits
+    its row before writing the blob, so either we see the row and restore
+    the files, or the upload rewrites the blob after we are done.
+    """
+    aside = []
+    for candidate in (path, path + ".br", path + ".gz"):
+        trash = f"{candidate}.{uuid.uuid4().hex}.gc"
+        try:
+            os.replace(candidate, trash)
+        except FileNotFoundError:
+            continue
+        aside.append((candidate, trash))
+
+    session.rollback()  # fresh snapshot for the check below
+    if session.get(MediaAsset, sha256, populate_existing=True) is not None:
+        for candidate, trash in aside:
+            if os.path.exists(candidate):
+                _remove_file(trash)
+            else:
+                os.replace(trash, candidate)
+        return False
+    for _candidate, trash in aside:
+        _remove_file(trash)
+    return True
+
+
+def _stored_files() -> Iterable[str]:
+    for root, _dirs, files in os.walk(CAS_DIR):
+        for name in files:
+            yield os.path.join(root, name)
+
+
+def _remove_variants(url: str) -> None:
+    """Resized copies live in uploads/derived/<source path>/."""
+    relative = url[len(URL_PREFIX):]
+    shutil.rmtree(os.path.join(UPLOAD_DIR, "derived", *relative.split("/")), ignore_errors=True)
+
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
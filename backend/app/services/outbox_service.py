@@ -0,0 +1,259 @@
+import asyncio
+import html as html_lib
+import logging
+import os
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple, cast
+
+from sqlalchemy import CursorResult, or_, update
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..models.database import async_engine
+from ..models.portfolio import OutboxEmail, OutboxStatus, table_of
+from .email_service import get_email_client
+
+logger = logging.getLogger(__name__)
+
+# New rows wait this long so a burst of them leaves as one digest
+OUTBOX_DIGEST_WINDOW_SECONDS = float(os.getenv("OUTBOX_DIGEST_WINDOW_SECONDS", "30"))
+OUTBOX_DIGEST_MAX_ITEMS = int(os.getenv("OUTBOX_DIGEST_MAX_ITEMS", "20"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE_SECONDS = float(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "10"))
+OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "1800"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "30"))
+# A whole send is cut off after this; the email client's own timeout is per phase
+OUTBOX_SEND_TIMEOUT_SECONDS = 30
+# A claimed row is retried by another worker if not released within the lease.
+# The lease is renewed before each send, so it only has to outlast one.
+OUTBOX_LEASE_SECONDS = 60
+OUTBOX_BATCH_SIZE = 50
+DIGEST_SUBJECTS = {"contact": "{count} new contact messages"}
+
+_wakeup: Optional[asyncio.Event] = None
+_worker: Optional[asyncio.Task] = None
+
+
+def _backoff(attempts: int) -> float:
+    """Exponential backoff with full jitter, capped."""
+    ceiling = min(OUTBOX_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), OUTBOX_BACKOFF_MAX_SECONDS)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def enqueue_email(session: AsyncSession, subject: str, html: str, digest_key: Optional[str] = None) -> OutboxEmail:
+    """
+    Add a notification to the outbox in the caller's transaction: it is
+    sent if and only if the caller commits. Call notify_outbox() after
+    the commit to wake the worker.
+    """
+    delay = OUTBOX_DIGEST_WINDOW_SECONDS if digest_key else 0
+    email = OutboxEmail(
+        subject=subject,
+        html=html,
+        digest_key=digest_key,
+        next_attempt_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    session.add(email)
+    return email
+
+
+def notify_outbox() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def _claim(session: AsyncSession, rows: Sequence[OutboxEmail], now: datetime, lease: datetime) -> List[OutboxEmail]:
+    table = table_of(OutboxEmail)
+    claimed = []
+    for row in rows:
+        # Conditional update: only one worker wins each row
+        won = cast(CursorResult, await session.execute(
+            update(table)
+            .where(
+                table.c.id == row.id,
+                or_(table.c.locked_until.is_(None), table.c.locked_until < now),
+            )
+            .values(locked_until=lease)
+        )).rowcount
+        if won:
+            claimed.append(row)
+    return claimed
+
+
+async def _claim_due(session: AsyncSession) -> Tuple[List[OutboxEmail], datetime]:
+    """Claim the due rows (and their digest siblings); returns them with the lease they hold."""
+    now = datetime.utcnow()
+    lease = now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+    unlocked = or_(col(OutboxEmail.locked_until).is_(None), col(OutboxEmail.locked_until) < now)
+    due = (await session.exec(
+        select(OutboxEmail)
+        .where(OutboxEmail.status == OutboxStatus.PENDING, OutboxEmail.next_attempt_at <= now, unlocked)
+        .order_by(col(OutboxEmail.next_attempt_at))
+        .limit(OUTBOX_BATCH_SIZE)
+    )).all()
+    claimed = await _claim(session, due, now, lease)
+
+    # The rest of the burst rides along, even if its own window is still open
+    keys = {row.digest_key for row in claimed if row.digest_key}
+    if keys:
+        siblings = (await session.exec(
+            select(OutboxEmail)
+            .where(
+                OutboxEmail.status == OutboxStatus.PENDING,
+                col(OutboxEmail.digest_key).in_(keys),
+                OutboxEmail.attempts == 0,
+                OutboxEmail.next_attempt_at > now,
+                unlocked,
+            )
+            .limit(OUTBOX_BATCH_SIZE)
+        )).all()
+        claimed += await _claim(session, siblings, now, lease)
+    await session.commit()
+    return claimed, lease
+
+
+async def _renew_lease(session: AsyncSession, group: List[OutboxEmail], held: datetime) -> Optional[datetime]:
+    """
+    Push the group's lease forward before a send. Returns the new lease, or
+    None if any row's lease is no longer the one we hold (it expired and
+    another worker claimed it): that worker sends it, we must not.
+    """
+    table = table_of(OutboxEmail)
+    lease = datetime.utcnow() + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+    ids = [row.id for row in group]
+    renewed = cast(CursorResult, await session.execute(
+        update(table).where(table.c.id.in_(ids), table.c.locked_until == held).values(locked_until=lease)
+    )).rowcount
+    if renewed != len(ids):
+        await session.rollback()
+        return None
+    await session.commit()
+    return lease
+
+
+def _groups(rows: Sequence[OutboxEmail]) -> List[List[OutboxEmail]]:
+    by_key: Dict[str, List[OutboxEmail]] = defaultdict(list)
+    groups = []
+    for row in sorted(rows, key=lambda r: r.created_at):
+        if row.digest_key:
+            by_key[row.digest_key].append(row)
+        else:
+            groups.append([row])
+    for rows_for_key in by_key.values():
+        for start in range(0, len(rows_for_key), OUTBOX_DIGEST_MAX_ITEMS):
+            groups.append(rows_for_key[start:start + OUTBOX_DIGEST_MAX_ITEMS])
+    return groups
+
+
+def _digest(group: List[OutboxEmail]) -> tuple:
+    if len(group) == 1:
+        return group[0].subject, group[0].html
+    subject = DIGEST_SUBJECTS.get(group[0].digest_key or "", "{count} new notifications").format(count=len(group))
+    items = "".join(f"<h2>{html_lib.escape(row.subject)}</h2>{row.html}<hr/>" for row in group)
+    return subject, f"<h1>{subject}</h1>{items}"
+
+
+async def _settle(session: AsyncSession, group: List[OutboxEmail], error: Optional[str]) -> None:
+    table = table_of(OutboxEmail)
+    ids = [row.id for row in group]
+    if error is None:
+        await session.execute(table.delete().where(table.c.id.in_(ids)))
+        return
+
+    now = datetime.utcnow()
+    for row in group:
+        attempts = row.attempts + 1
+        values = {"attempts": attempts, "last_error": error[:500], "locked_until": None}
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            values["status"] = OutboxStatus.FAILED
+            logger.error("Outbox email %s gave up after %d attempts: %s", row.id, attempts, error)
+        else:
+            values["next_attempt_at"] = now + timedelta(seconds=_backoff(attempts))
+        await session.execute(update(table).where(table.c.id == row.id).values(**values))
+    logger.warning("Outbox send of %d email(s) failed: %s", len(group), error)
+
+
+async def process_outbox() -> int:
+    """
+    Claim, group and send every due email once. Returns the number of rows handled.
+
+    Each group's outcome is committed right after its send, so a crash or
+    a later failure never rolls back (and re-sends) groups already sent.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        rows, lease = await _claim_due(session)
+        if not rows:
+            return 0
+        client = await get_email_client(session)
+        for group in _groups(rows):
+            group_lease = await _renew_lease(session, group, lease)
+            if group_lease is None:
+                logger.warning("Outbox lease lost for %d email(s), left to their new owner", len(group))
+                continue
+            subject, body = _digest(group)
+            try:
+                await asyncio.wait_for(
+                    client.send_email(to="", subject=subject, html=body), OUTBOX_SEND_TIMEOUT_SECONDS
+                )
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            await _settle(session, group, error)
+            await session.commit()
+    return len(rows)
+
+
+async def _seconds_until_next() -> float:
+    async with AsyncSession(async_engine) as session:
+        row = (await session.exec(
+            select(OutboxEmail.next_attempt_at, OutboxEmail.locked_until)
+            .where(OutboxEmail.status == OutboxStatus.PENDING)
+            .order_by(col(OutboxEmail.next_attempt_at))
+            .limit(1)
+        )).first()
+    if row is None:
+        return OUTBOX_POLL_SECONDS
+    # A row leased by another worker is not ours before the lease ends
+    next_at = max(row[0], row[1] or row[0])
+    delay = (next_at - datetime.utcnow()).total_seconds()
+    return min(max(delay, 0.05), OUTBOX_POLL_SECONDS)
+
+
+async def _run_worker(wakeup: asyncio.Event) -> None:
+    while True:
+        try:
+            if await process_outbox():
+                continue
+            delay = await _seconds_until_next()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Outbox worker iteration failed")
+            delay = OUTBOX_POLL_SECONDS
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        wakeup.clear()
+
+
+def start_outbox_worker() -> None:
+    """Start the outbox worker on the running loop (app lifespan)."""
+    global _worker, _wakeup
+    if _worker is None or _worker.done():
+        _wakeup = asyncio.Event()
+        _worker = asyncio.create_task(_run_worker(_wakeup), name="outbox-worker")
+
+
+async def stop_outbox_worker() -> None:
+    global _worker, _wakeup
+    if _worker is not None:
+        _worker.cancel()
+        try:
+            await _worker
+        except asyncio.CancelledError:
+            pass
+    _worker = None
+    _wakeup = None
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import delete, update
+
+from ..models.database import async_engine
+from ..models.portfolio import RateLimitBucket, table_of
+
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | database
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))
+# Database backend: purge expired windows once every N hits per process
+RATE_LIMIT_PURGE_EVERY = 200
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+
+def _evaluate(previous: int, current: int, limit: int, window: float, now: float) -> RateLimitResult:
+    """
+    Sliding-window counter: weight the previous fixed window by how much of
+    it still overlaps the sliding window ending now. ``current`` already
+    includes the request being evaluated.
+    """
+    elapsed = now % window
+    weight = 1 - elapsed / window
+    estimate = previous * weight + current
+    if estimate <= limit:
+        return RateLimitResult(True, limit, max(int(limit - estimate), 0), 0.0)
+
+    if current > limit or previous == 0:
+        retry_after = window - elapsed
+    else:
+        # Time until the previous window's share has decayed enough
+        retry_after = window * (1 - (limit - current) / previous) - elapsed
+    return RateLimitResult(False, limit, 0, max(retry_after, 1.0))
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        """Count one request for ``key`` and evaluate it against ``limit`` per ``window`` seconds."""
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process counters, O(1) per hit. Each key keeps only its current and
+    previous window counts, and the least recently seen keys are evicted
+    beyond ``max_keys`` so memory stays bounded.
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        # key -> [window_index, current_count, previous_count]
+        self._buckets: OrderedDict[str, list[int]] = OrderedDict()
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        now = time.time()
+        index = int(now // window)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [index, 0, 0]
+            self._buckets[key] = bucket
+        elif bucket[0] != index:
+            previous = bucket[1] if bucket[0] == index - 1 else 0
+            bucket[:] = [index, 0, previous]
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        result = _evaluate(bucket[2], bucket[1] + 1, limit, window, now)
+        if result.allowed:
+            bucket[1] += 1
+        return result
+
+
+class DatabaseRateLimitBackend(RateLimitBackend):
+    """
+    Counters shared by every worker through the ``ratelimitbucket`` table.
+    The increment is a single atomic upsert; a denied hit is rolled back so
+    it does not count against the client.
+    """
+
+    def __init__(self) -> None:
+        self._hits = 0
+
+    async def hit(self, key: str, limit: int, window: float) -> RateLimitResult:
+        now = time.time()
+        index = int(now // window)
+        table = table_of(RateLimitBucket)
+        async with async_engine.begin() as conn:
+            current = (await conn.execute(self._upsert(conn.dialect.name, key, index))).scalar_one()
+            previous = (await conn.execute(
+                table.select()
+                .with_only_columns(table.c.count)
+                .where(table.c.key == key, table.c.window_index == index - 1)
+            )).scalar_one_or_none() or 0
+
+            result = _evaluate(previous, current, limit, window, now)
+            if not result.allowed:
+                await conn.execute(
+                    update(table)
+                    .where(table.c.key == key, table.c.window_index == index)
+                    .values(count=table.c.count - 1)
+                )
+
+            self._hits += 1
+            if self._hits % RATE_LIMIT_PURGE_EVERY == 0:
+                await conn.execute(delete(table).where(table.c.window_index < index - 1))
+        return result
+
+    @staticmethod
+    def _upsert(dialect: str, key: str, index: int):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise RuntimeError(f"Database rate limiting is not supported on {dialect}")
+        table = table_of(RateLimitBucket)
+        stmt = insert(table).values(key=key, window_index=index, count=1)
+        return stmt.on_conflict_do_update(
+            index_elements=[table.c.key, table.c.window_index],
+            set_={"count": table.c.count + 1},
+        ).returning(table.c.count)
+
+
+_BACKEND: Optional[RateLimitBackend] = None
+
+
+def get_rate_limit_backend() -> RateLimitBackend:
+    global _BACKEND
+    if _BACKEND is None:
+        if RATE_LIMIT_BACKEND == "database":
+            _BACKEND = DatabaseRateLimitBackend()
+        elif RATE_LIMIT_BACKEND == "memory":
+            _BACKEND = MemoryRateLimitBackend()
+        else:
+            raise RuntimeError(f"Unsupported RATE_LIMIT_BACKEND: {RATE_LIMIT_BACKEND}")
+    return _BACKEND
+
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def rate_limit(
+    scope: str,
+    limit: int,
+    window_seconds: float,
+    key_func: Callable[[Request], str] = client_ip,
+):
+    """
+    Build a FastAPI dependency allowing ``limit`` requests per
+    ``window_seconds`` for each key (the client IP by default).
+    Usage: ``dependencies=[Depends(rate_limit("contact", 5, 60))]``.
+    """
+    async def dependency(request: Request, response: Response) -> None:
+        result = await get_rate_limit_backend().hit(f"{scope}:{key_func(request)}", limit, window_seconds)
+        headers = {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+        }
+        if not result.allowed:
+            headers["Retry-After"] = str(math.ceil(result.retry_after))
+            raise HTTPException(status_code=429, detail="Too many requests", headers=headers)
+        response.headers.update(headers)
+
+    return dependency
@@ -1,50 +1,334 @@
 import asyncio
+import logging
 import os
-from typing import List
-import aiohttp
+import random
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, cast
+
+from sqlalchemy import CursorResult, func, or_, update
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from . import http_client
+from ..models.database import async_engine
+from ..models.portfolio import RevalidationJob, RevalidationStatus, table_of
+
+logger = logging.getLogger(__name__)
 
 REVALIDATE_SECRET = os.getenv("REVALIDATE_SECRET")
 MANSAH_URL = os.getenv("MANSAH_URL", "https://mansah.vercel.app")
 AGENCY_URL = os.getenv("AGENCY_URL", "")
 
+# Edits within this window are merged into a single POST per frontend
+REVALIDATION_DEBOUNCE_SECONDS = float(os.getenv("REVALIDATION_DEBOUNCE_SECONDS", "2"))
+REVALIDATION_MAX_ATTEMPTS = int(os.getenv("REVALIDATION_MAX_ATTEMPTS", "8"))
+REVALIDATION_BACKOFF_BASE_SECONDS = float(os.getenv("REVALIDATION_BACKOFF_BASE_SECONDS", "2"))
+REVALIDATION_BACKOFF_MAX_SECONDS = float(os.getenv("REVALIDATION_BACKOFF_MAX_SECONDS", "300"))
+REVALIDATION_POLL_SECONDS = float(os.getenv("REVALIDATION_POLL_SECONDS", "5"))
+# A claimed job is retried by another worker if not released within the lease
+REVALIDATION_LEASE_SECONDS = 30
+REVALIDATION_BATCH_SIZE = 20
+
+
+def _frontend_urls() -> List[str]:
+    return [url for url in (MANSAH_URL, AGENCY_URL) if url]
+
+
+def _merge_paths(existing: List[str], new: List[str]) -> List[str]:
+    return list(dict.fromkeys([*existing, *new]))
+
+
+def _backoff(attempts: int) -> float:
+    """Exponential backoff with full jitter, capped."""
+    ceiling = min(REVALIDATION_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), REVALIDATION_BACKOFF_MAX_SECONDS)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class RevalidationMetrics:
+    """In-process counters; queue depth is read from the table."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.coalesced = 0
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.given_up = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.last_error: Optional[str] = None
+
+    def incr(self, attr: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + amount)
+
+    def record_delivery(self, latency: float) -> None:
+        with self._lock:
+            self.delivered += 1
+            self.latency_total += latency
+            self.latency_max = max(self.latency_max, latency)
+
+    def record_failure(self, error: str, gave_up: bool) -> None:
+        with self._lock:
+            self.failed_attempts += 1
+            self.given_up += int(gave_up)
+            self.last_error = error
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enqueued": self.enqueued,
+                "coalesced": self.coalesced,
+                "delivered": self.delivered,
+                "failed_attempts": self.failed_attempts,
+                "given_up": self.given_up,
+                "latency_avg_ms": round(self.latency_total / self.delivered * 1000, 1) if self.delivered else 0.0,
+                "latency_max_ms": round(self.latency_max * 1000, 1),
+                "last_error": self.last_error,
+            }
+
+
+revalidation_metrics = RevalidationMetrics()
+_wakeup: Optional[asyncio.Event] = None
+_worker: Optional[asyncio.Task] = None
+
+
 async def trigger_revalidation(paths: List[str]):
     """
-    Déclenche la revalidation ISR sur les frontends configurés.
-    Fire-and-forget : ne bloque jamais, log les erreurs.
+    Met en file la revalidation ISR des ``paths`` sur les frontends configurés.
+
+    Les chemins sont fusionnés dans le job encore en attente (fenêtre de
+    debounce) au lieu de créer un POST par édition ; le worker les envoie
+    avec retry / backoff. Ne lève jamais : une erreur est loguée.
     """
     if not REVALIDATE_SECRET:
-        print("Warning: REVALIDATE_SECRET not configured, skipping revalidation")
+        logger.warning("REVALIDATE_SECRET not configured, skipping revalidation")
         return
 
-    frontend_urls = []
-    if MANSAH_URL:
-        frontend_urls.append(MANSAH_URL)
-    if AGENCY_URL:
-        frontend_urls.append(AGENCY_URL)
-
+    frontend_urls = _frontend_urls()
     if not frontend_urls:
-        print("Warning: No frontend URLs configured for revalidation")
+        logger.warning("No frontend URLs configured for revalidation")
+        return
+
+    try:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            for url in frontend_urls:
+                await _enqueue(session, url, paths)
+    except Exception:
+        logger.exception("Failed to enqueue revalidation for %s", paths)
         return
 
-    async def revalidate_frontend(url: str):
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def _enqueue(session: AsyncSession, url: str, paths: List[str]) -> None:
+    revalidation_metrics.incr("enqueued")
+    table = table_of(RevalidationJob)
+    # A job that was never attempted nor claimed can still absorb new paths
+    open_job = (await session.exec(
+        select(RevalidationJob)
+        .where(
+            RevalidationJob.frontend_url == url,
+            RevalidationJob.status == RevalidationStatus.PENDING,
+            RevalidationJob.attempts == 0,
+            col(RevalidationJob.locked_until).is_(None),
+        )
+        .order_by(col(RevalidationJob.created_at))
+        .limit(1)
+    )).first()
+
+    if open_job is not None:
+        merged = cast(CursorResult, await session.execute(
+            update(table)
+            .where(
+                table.c.id == open_job.id,
+                table.c.version == open_job.version,
+                table.c.locked_until.is_(None),
+            )
+            .values(
+                paths=_merge_paths(open_job.paths, paths),
+                version=open_job.version + 1,
+                updated_at=datetime.utcnow(),
+            )
+        )).rowcount
+        await session.commit()
+        if merged:
+            revalidation_metrics.incr("coalesced")
+            return
+
+    now = datetime.utcnow()
+    session.add(RevalidationJob(
+        frontend_url=url,
+        paths=_merge_paths([], paths),
+        next_attempt_at=now + timedelta(seconds=REVALIDATION_DEBOUNCE_SECONDS),
+        created_at=now,
+        updated_at=now,
+    ))
+    await session.commit()
+
+
+async def _claim_due_jobs(session: AsyncSession) -> List[RevalidationJob]:
+    now = datetime.utcnow()
+    table = table_of(RevalidationJob)
+    candidates = (await session.exec(
+        select(RevalidationJob)
+        .where(
+            RevalidationJob.status == RevalidationStatus.PENDING,
+            RevalidationJob.next_attempt_at <= now,
+            or_(col(RevalidationJob.locked_until).is_(None), col(RevalidationJob.locked_until) < now),
+        )
+        .order_by(col(RevalidationJob.next_attempt_at))
+        .limit(REVALIDATION_BATCH_SIZE)
+    )).all()
+
+    claimed = []
+    lease = now + timedelta(seconds=REVALIDATION_LEASE_SECONDS)
+    for job in candidates:
+        # Conditional update: only one worker wins each job
+        won = cast(CursorResult, await session.execute(
+            update(table)
+            .where(
+                table.c.id == job.id,
+                table.c.version == job.version,
+                or_(table.c.locked_until.is_(None), table.c.locked_until < now),
+            )
+            .values(locked_until=lease, version=job.version + 1)
+        )).rowcount
+        if won:
+            job.version += 1
+            claimed.append(job)
+    await session.commit()
+    return claimed
+
+
+async def _deliver(job: RevalidationJob) -> Optional[str]:
+    """POST the job's paths; returns an error message or None on success."""
+    try:
+        response = await http_client.post(
+            f"{job.frontend_url}/api/revalidate",
+            json={"secret": REVALIDATE_SECRET, "paths": job.paths},
+            timeout=5,
+        )
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    if response.status_code != 200:
+        return f"HTTP {response.status_code}"
+    return None
+
+
+async def _settle(session: AsyncSession, job: RevalidationJob, error: Optional[str]) -> None:
+    table = table_of(RevalidationJob)
+    now = datetime.utcnow()
+    if error is None:
+        await session.execute(table.delete().where(table.c.id == job.id))
+        revalidation_metrics.record_delivery((now - job.created_at).total_seconds())
+        logger.info("Revalidation delivered to %s: %s", job.frontend_url, job.paths)
+        return
+
+    attempts = job.attempts + 1
+    gave_up = attempts >= REVALIDATION_MAX_ATTEMPTS
+    values = {
+        "attempts": attempts,
+        "last_error": error[:500],
+        "locked_until": None,
+        "updated_at": now,
+        "version": job.version + 1,
+    }
+    if gave_up:
+        values["status"] = RevalidationStatus.FAILED
+        logger.error("Revalidation for %s gave up after %d attempts: %s", job.frontend_url, attempts, error)
+    else:
+        values["next_attempt_at"] = now + timedelta(seconds=_backoff(attempts))
+        logger.warning("Revalidation for %s failed (attempt %d): %s", job.frontend_url, attempts, error)
+    await session.execute(update(table).where(table.c.id == job.id).values(**values))
+    revalidation_metrics.record_failure(error, gave_up)
+
+
+async def process_due_jobs() -> int:
+    """Claim and deliver every due job once. Returns the number of jobs handled."""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        jobs = await _claim_due_jobs(session)
+        if not jobs:
+            return 0
+        errors = await asyncio.gather(*(_deliver(job) for job in jobs))
+        for job, error in zip(jobs, errors):
+            await _settle(session, job, error)
+        await session.commit()
+    return len(jobs)
+
+
+async def _seconds_until_next_job() -> float:
+    async with AsyncSession(async_engine) as session:
+        next_at = (await session.exec(
+            select(func.min(RevalidationJob.next_attempt_at))
+            .where(RevalidationJob.status == RevalidationStatus.PENDING)
+        )).first()
+    if next_at is None:
+        return REVALIDATION_POLL_SECONDS
+    delay = (next_at - datetime.utcnow()).total_seconds()
+    return min(max(delay, 0.05), REVALIDATION_POLL_SECONDS)
+
+
+async def _run_worker(wakeup: asyncio.Event) -> None:
+    while True:
+        try:
+            if await process_due_jobs():
+                continue
+            delay = await _seconds_until_next_job()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Revalidation worker iteration failed")
+            delay = REVALIDATION_POLL_SECONDS
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        wakeup.clear()
+
+
+def start_revalidation_worker() -> None:
+    """Start the queue worker on the running loop (app lifespan)."""
+    global _worker, _wakeup
+    if _worker is None or _worker.done():
+        _wakeup = asyncio.Event()
+        _worker = asyncio.create_task(_run_worker(_wakeup), name="revalidation-worker")
+
+
+async def stop_revalidation_worker() -> None:
+    global _worker, _wakeup
+    if _worker is not None:
+        _worker.cancel()
         try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "secret": REVALIDATE_SECRET,
-                    "paths": paths
-                }
-                async with session.post(
-                    f"{url}/api/revalidate",
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=5)
-                ) as response:
-                    if response.status == 200:
-                        print(f"Revalidation triggered for {url}: {paths}")
-                    else:
-                        print(f"Revalidation failed for {url}: HTTP {response.status}")
-        except Exception as e:
-            print(f"Revalidation error for {url}: {e}")
-
-    # Fire-and-forget : lance toutes les revalidations en parallèle
-    tasks = [revalidate_frontend(url) for url in frontend_urls]
-    asyncio.create_task(asyncio.gather(*tasks, return_exceptions=True))
\ No newline at end of file
+            await _worker
+        except asyncio.CancelledError:
+            pass
+    _worker = None
+    _wakeup = None
+
+
+async def revalidation_queue_stats(session: AsyncSession) -> Dict[str, object]:
+    """Queue depth and age of the oldest pending job, read from the table."""
+    now = datetime.utcnow()
+    rows = (await session.exec(
+        select(
+            RevalidationJob.status,
+            func.count(),
+            func.min(RevalidationJob.created_at),
+        ).group_by(RevalidationJob.status)
+    )).all()
+    by_status = {status: (count, oldest) for status, count, oldest in rows}
+    pending_count, oldest_pending = by_status.get(RevalidationStatus.PENDING, (0, None))
+    retrying = (await session.exec(
+        select(func.count()).where(
+            RevalidationJob.status == RevalidationStatus.PENDING, RevalidationJob.attempts > 0
+        )
+    )).one()
+    return {
+        "pending": pending_count,
+        "retrying": retrying,
+        "failed": by_status.get(RevalidationStatus.FAILED, (0, None))[0],
+        "oldest_pending_age_seconds": round((now - oldest_pending).total_seconds(), 1) if oldest_pending else None,
+    }
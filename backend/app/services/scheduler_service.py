@@ -1,56 +1,121 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-from sqlmodel import Session, select
-from datetime import datetime
-from ..models.database import get_session
+from apscheduler.triggers.date import DateTrigger
+from sqlmodel import col, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from ..models.database import async_engine
 from ..models.portfolio import Article
 from ..models.blog import BlogStatus
 from .revalidation_service import trigger_revalidation
+from .cache_service import invalidate
+
+# published_at est stocké en UTC naïf (datetime.utcnow)
+scheduler = AsyncIOScheduler(timezone=timezone.utc)
+
+PUBLISH_JOB_ID = "publish_scheduled_articles"
+# Après une erreur (base indisponible…), nouvel essai dans ce délai
+PUBLISH_RETRY_DELAY = timedelta(minutes=1)
+
+
+def _armed_at() -> Optional[datetime]:
+    job = scheduler.get_job(PUBLISH_JOB_ID)
+    return job.next_run_time.replace(tzinfo=None) if job and job.next_run_time else None
+
+
+def _arm(run_at: Optional[datetime]) -> None:
+    """Un seul timer, à l'échéance donnée ; aucun job si rien n'est planifié."""
+    if run_at is None:
+        if scheduler.get_job(PUBLISH_JOB_ID):
+            scheduler.remove_job(PUBLISH_JOB_ID)
+        return
+    scheduler.add_job(
+        publish_scheduled_articles,
+        # Une échéance passée (redémarrage) part tout de suite
+        trigger=DateTrigger(run_date=max(run_at, datetime.utcnow())),
+        id=PUBLISH_JOB_ID,
+        name="Publish Scheduled Articles",
+        replace_existing=True,
+        misfire_grace_time=None,
+        # Réarmé pendant qu'une exécution se termine (article enregistré à ce
+        # moment-là) : avec une seule instance APScheduler sauterait le job
+        # et le supprimerait. La publication est idempotente.
+        max_instances=2,
+    )
+
+
+async def _next_due(session: AsyncSession) -> Optional[datetime]:
+    # Servi par l'index partiel ix_article_scheduled_due
+    return (await session.exec(
+        select(func.min(Article.published_at)).where(Article.status == BlogStatus.scheduled)
+    )).first()
+
+
+async def rearm_publisher() -> None:
+    """Relit la prochaine échéance en base et réarme le timer."""
+    async with AsyncSession(async_engine) as session:
+        _arm(await _next_due(session))
+
+
+def schedule_publication(article: Article) -> None:
+    """
+    À appeler après le commit d'un article créé / modifié. Avance le timer
+    si l'article est planifié plus tôt que l'échéance armée ; un report ou
+    une déplanification laisse le timer partir, il se réarme à vide.
+    """
+    if not scheduler.running or article.status != BlogStatus.scheduled or article.published_at is None:
+        return
+    armed = _armed_at()
+    if armed is None or article.published_at < armed:
+        _arm(article.published_at)
+
+
+async def _publish_due(session: AsyncSession) -> None:
+    # Trouver tous les articles scheduled dont published_at <= now
+    now = datetime.utcnow()
+    scheduled_articles = (await session.exec(
+        select(Article).where(
+            Article.status == BlogStatus.scheduled,
+            col(Article.published_at) <= now
+        )
+    )).all()
+
+    for article in scheduled_articles:
+        article.status = BlogStatus.published
+        session.add(article)
+        print(f"Published scheduled article: {article.title}")
+
+    if scheduled_articles:
+        await session.commit()
+        invalidate("articles")
+        # Trigger revalidation pour le blog
+        await trigger_revalidation(["/blog"])
 
-scheduler = AsyncIOScheduler()
 
 async def publish_scheduled_articles():
-    """Job qui s'exécute toutes les 5 minutes pour publier les articles planifiés."""
-    session = next(get_session())
+    """Publie les articles planifiés arrivés à échéance puis réarme le timer sur la suivante."""
     try:
-        # Trouver tous les articles scheduled dont published_at <= now
-        now = datetime.utcnow()
-        scheduled_articles = session.exec(
-            select(Article).where(
-                Article.status == BlogStatus.scheduled,
-                Article.published_at <= now
-            )
-        ).all()
-
-        for article in scheduled_articles:
-            article.status = BlogStatus.published
-            session.add(article)
-            print(f"Published scheduled article: {article.title}")
-
-        if scheduled_articles:
-            session.commit()
-            # Trigger revalidation pour le blog
-            await trigger_revalidation(["/blog"])
+        # Une échéance atteinte pendant le commit / la revalidation est
+        # traitée ici : on ne réarme que sur une date future.
+        while True:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                await _publish_due(session)
+                next_due = await _next_due(session)
+            if next_due is None or next_due > datetime.utcnow():
+                break
+        _arm(next_due)
 
     except Exception as e:
         print(f"Error in publish_scheduled_articles: {e}")
-        session.rollback()
-    finally:
-        session.close()
+        _arm(datetime.utcnow() + PUBLISH_RETRY_DELAY)
 
-def start_scheduler():
-    """Démarre le scheduler avec le job de publication."""
+async def start_scheduler():
+    """Démarre le scheduler et arme le timer sur la prochaine publication."""
     if not scheduler.running:
-        scheduler.add_job(
-            publish_scheduled_articles,
-            trigger=IntervalTrigger(minutes=5),
-            id="publish_scheduled_articles",
-            name="Publish Scheduled Articles",
-            max_instances=1
-        )
         scheduler.start()
+        await rearm_publisher()
 
 def stop_scheduler():
     """Arrête le scheduler."""
     if scheduler.running:
-        scheduler.shutdown()
\ No newline at end of file
+        scheduler.shutdown()
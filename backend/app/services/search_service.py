@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import html
+import re
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import String, cast, func, inspect, literal_column, or_, text
+from sqlmodel import Session
+
+from ..models.portfolio import Article, ContactMessage, Project
+
+# Text search configuration used by the generated columns (see the
+# 20261018_add_search_vectors migration). 'simple' avoids stemming content
+# that mixes French and English.
+TS_CONFIG = "simple"
+SEARCH_VECTOR_COLUMN = "search_vector"
+# ts_headline copies the source text verbatim: it marks matches with
+# private-use sentinels, and the text is HTML-escaped in Python before the
+# sentinels become <mark>, like the fallback snippets.
+MARK_START, MARK_STOP = "\ue000", "\ue001"
+HEADLINE_OPTIONS = f'StartSel="{MARK_START}", StopSel="{MARK_STOP}", MaxWords=30, MinWords=12, MaxFragments=2'
+SNIPPET_RADIUS = 80
+
+
+@dataclass(frozen=True)
+class SearchSpec:
+    table: str
+    # Columns matched with ILIKE when the tsvector column is unavailable
+    fallback_columns: tuple[Any, ...]
+    # SQL expression fed to ts_headline to build the snippet
+    headline_source: str
+    # Python attributes scored on the fallback path, most important first
+    rank_attrs: tuple[str, ...]
+    # Python attributes used to build the snippet on the fallback path
+    snippet_attrs: tuple[str, ...]
+
+
+ARTICLE_SEARCH = SearchSpec(
+    table="article",
+    fallback_columns=(Article.title, Article.excerpt, cast(Article.content, String)),
+    headline_source="coalesce(article.excerpt, '') || ' ' || coalesce(article.content->>'intro', '')",
+    rank_attrs=("title", "excerpt", "content"),
+    snippet_attrs=("excerpt", "content", "title"),
+)
+
+PROJECT_SEARCH = SearchSpec(
+    table="project",
+    fallback_columns=(Project.title, Project.client_name, Project.industry, cast(Project.description, String)),
+    headline_source=(
+        "coalesce(project.description->>'problem', '') || ' ' || "
+        "coalesce(project.description->>'solution', '')"
+    ),
+    rank_attrs=("title", "client_name", "description"),
+    snippet_attrs=("description", "title", "client_name"),
+)
+
+CONTACT_SEARCH = SearchSpec(
+    table="contactmessage",
+    fallback_columns=(ContactMessage.subject, ContactMessage.company, ContactMessage.message),
+    headline_source="coalesce(contactmessage.message, '')",
+    rank_attrs=("subject", "company", "message"),
+    snippet_attrs=("message", "subject", "company"),
+)
+
+_VECTOR_SUPPORT: dict[tuple[str, str], bool] = {}
+
+
+def has_search_vector(session: Session, spec: SearchSpec) -> bool:
+    """True when the DB is Postgres and the migration adding the tsvector column has run."""
+    bind = session.get_bind()
+    if bind.dialect.name != "postgresql":
+        return False
+    cache_key = (str(bind.engine.url), spec.table)
+    if cache_key not in _VECTOR_SUPPORT:
+        columns = inspect(bind.engine).get_columns(spec.table)
+        _VECTOR_SUPPORT[cache_key] = any(c["name"] == SEARCH_VECTOR_COLUMN for c in columns)
+    return _VECTOR_SUPPORT[cache_key]
+
+
+_CONFIG = literal_column(f"'{TS_CONFIG}'::regconfig")
+
+
+def _vector(spec: SearchSpec):
+    return literal_column(f"{spec.table}.{SEARCH_VECTOR_COLUMN}")
+
+
+def _ts_query(term: str):
+    return func.websearch_to_tsquery(_CONFIG, term)
+
+
+def rank_expression(spec: SearchSpec, term: str):
+    return func.ts_rank_cd(_vector(spec), _ts_query(term))
+
+
+def apply_search(session: Session, statement: Any, spec: SearchSpec, term: str) -> Any:
+    """
+    Filter ``statement`` by ``term`` and order matches by relevance.
+
+    On Postgres the GIN-indexed ``search_vector`` column is used; elsewhere
+    (SQLite in local tests) it falls back to ILIKE over the same fields.
+    """
+    if has_search_vector(session, spec):
+        return (
+            statement
+            .where(_vector(spec).op("@@")(_ts_query(term)))
+            .order_by(rank_expression(spec, term).desc())
+        )
+    return substring_filter(statement, spec, term)
+
+
+def substring_filter(statement: Any, spec: SearchSpec, term: str) -> Any:
+    """
+    Plain ILIKE over the spec's fields, on every database: "acm" matches
+    "Acme", which a full-text query does not. For admin filters typed as
+    you go, where partial words matter more than ranking.
+    """
+    pattern = f"%{term}%"
+    return statement.where(or_(*(col.ilike(pattern) for col in spec.fallback_columns)))
+
+
+def run_search(session: Session, statement: Any, spec: SearchSpec, term: str, limit: int) -> list[tuple[Any, float, Optional[str]]]:
+    """Return ``(row, rank, snippet)`` tuples, best match first."""
+    if has_search_vector(session, spec):
+        rank = rank_expression(spec, term).label("rank")
+        snippet = func.ts_headline(
+            _CONFIG, text(spec.headline_source), _ts_query(term), HEADLINE_OPTIONS
+        ).label("snippet")
+        ranked = apply_search(session, statement.add_columns(rank, snippet), spec, term).limit(limit)
+        return [(row, float(r or 0), _headline_html(s)) for row, r, s in session.exec(ranked).all()]
+
+    rows = session.exec(apply_search(session, statement, spec, term)).all()
+    hits = [(row, _fallback_rank(row, spec, term), _fallback_snippet(row, spec, term)) for row in rows]
+    hits.sort(key=lambda hit: hit[1], reverse=True)
+    return hits[:limit]
+
+
+def _headline_html(snippet: Optional[str]) -> Optional[str]:
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_STOP, "</mark>")
+
+
+def _field_text(value: Any) -> str:
+    # Same view of JSON documents as jsonb_to_tsvector(..., '["string"]'): string leaves only
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, list):
+        return " ".join(filter(None, (_field_text(v) for v in value)))
+    return ""
+
+
+def _fallback_rank(row: Any, spec: SearchSpec, term: str) -> float:
+    # Mirror the A/B/C weights of the tsvector: earlier attributes count more
+    needle = term.lower()
+    weights = (1.0, 0.4, 0.2)
+    score = 0.0
+    for attr, weight in zip(spec.rank_attrs, weights):
+        score += weight * _field_text(getattr(row, attr, None)).lower().count(needle)
+    return score
+
+
+def _fallback_snippet(row: Any, spec: SearchSpec, term: str) -> Optional[str]:
+    pattern = re.compile(re.escape(term), re.IGNORECASE)
+    for attr in spec.snippet_attrs:
+        source = _field_text(getattr(row, attr, None))
+        match = pattern.search(source)
+        if not match:
+            continue
+        start = max(match.start() - SNIPPET_RADIUS, 0)
+        end = min(match.end() + SNIPPET_RADIUS, len(source))
+        excerpt = html.escape(source[start:end])
+        return pattern.sub(lambda m: f"<mark>{m.group(0)}</mark>", excerpt)
+    return None
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.encryption import decrypt_value
+from ..models.portfolio import Setting
+
+# Encrypted at rest; the snapshot keeps them decrypted
+SENSITIVE_KEYS = {"AI_API_KEY", "EMAIL_API_KEY"}
+# Bounds staleness when several workers run: update_settings only
+# invalidates the worker that handled it.
+SETTINGS_CACHE_TTL_SECONDS = float(os.getenv("SETTINGS_CACHE_TTL_SECONDS", "300"))
+
+
+class SettingsSnapshot:
+    """
+    Every Setting row, read in one query, with sensitive values decrypted
+    once. Clients built from it (AI, email) are memoized on the snapshot,
+    so they are rebuilt exactly when the settings change.
+    """
+
+    def __init__(self, rows: Iterable[Setting]) -> None:
+        self.values: Dict[str, str] = {}
+        for row in rows:
+            self.values[row.key] = decrypt_value(row.value) if row.key in SENSITIVE_KEYS and row.value else row.value
+        self.loaded_at = time.monotonic()
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.values.get(key)
+
+    def is_fresh(self, now: float) -> bool:
+        return now - self.loaded_at < SETTINGS_CACHE_TTL_SECONDS
+
+    def client(self, name: str, build: Callable[["SettingsSnapshot"], Any]) -> Any:
+        """``build(snapshot)`` once per snapshot; an exception is not cached."""
+        with self._lock:
+            if name not in self._clients:
+                self._clients[name] = build(self)
+            return self._clients[name]
+
+
+_snapshot: Optional[SettingsSnapshot] = None
+_snapshot_lock = threading.Lock()
+# Bumped by every invalidation; a load that started before one is not stored
+_generation = 0
+
+
+def _current() -> Optional[SettingsSnapshot]:
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.is_fresh(time.monotonic()):
+        return snapshot
+    return None
+
+
+def _store(snapshot: SettingsSnapshot, generation: int) -> SettingsSnapshot:
+    """Install ``snapshot`` unless settings were invalidated while it was loading."""
+    global _snapshot
+    with _snapshot_lock:
+        if generation == _generation:
+            _snapshot = snapshot
+    return snapshot
+
+
+async def settings_snapshot(session: AsyncSession) -> SettingsSnapshot:
+    """Cached snapshot; the database is only read after an invalidation or the TTL."""
+    current = _current()
+    if current is not None:
+        return current
+    generation = _generation
+    return _store(SettingsSnapshot((await session.exec(select(Setting))).all()), generation)
+
+
+def settings_snapshot_sync(session: Session) -> SettingsSnapshot:
+    current = _current()
+    if current is not None:
+        return current
+    generation = _generation
+    return _store(SettingsSnapshot(session.exec(select(Setting)).all()), generation)
+
+
+def invalidate_settings() -> None:
+    """Drop the snapshot and the clients built from it (called after a settings write)."""
+    global _snapshot, _generation
+    with _snapshot_lock:
+        _generation += 1
+        _snapshot = None
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from sqlalchemy import and_, exists, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Session, col
+
+from ..models.portfolio import Article
+
+
+def tag_filter(session: Session, tags: Iterable[str], match_all: bool = True) -> Any:
+    """
+    Build a WHERE clause matching articles tagged with ``tags``.
+
+    ``match_all`` requires every tag (AND), otherwise any of them (OR).
+    On Postgres this is a JSONB containment test (``tags @> '["x"]'``)
+    served by the GIN index; other dialects (SQLite in local tests) look
+    the values up with ``json_each``. Both compare whole tag values, so
+    "go" no longer matches "django".
+    """
+    tags = [t for t in dict.fromkeys(tags) if t]
+    if session.get_bind().dialect.name == "postgresql":
+        if match_all:
+            return col(Article.tags).op("@>")(literal(tags, JSONB))
+        return or_(*(col(Article.tags).op("@>")(literal([t], JSONB)) for t in tags))
+
+    elements = []
+    for t in tags:
+        values = func.json_each(Article.tags).table_valued("value")
+        elements.append(exists(select(1).select_from(values).where(values.c.value == t)))
+    return and_(*elements) if match_all else or_(*elements)
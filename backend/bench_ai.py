@@ -0,0 +1,76 @@
+"""
+Benchmark the social generation orchestrator against the FAKE provider
+(no network, no API key).
+
+    python bench_ai.py --latency-ms 300 --slow-rate 0.2 --slow-ms 3000
+
+Each of the six social prompts takes ``--latency-ms``; a fraction of the
+calls (``--slow-rate``) takes ``--slow-ms`` instead, to show what hedging
+does for tail latency. Reports a plain asyncio.gather, the orchestrator
+with a cold cache, and the orchestrator again on the same article (cache hit).
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.api.routers.social import SOCIAL_PROMPTS
+from app.services import ai_orchestrator
+from app.services.ai_orchestrator import content_version, generate_batch, generation_cache
+from app.services.ai_service import FakeAIClient
+
+
+class TailLatencyClient(FakeAIClient):
+    def __init__(self, latency_ms: float, slow_rate: float, slow_ms: float) -> None:
+        super().__init__(latency_ms=latency_ms)
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.calls = 0
+
+    async def generate_text(self, prompt: str) -> str:
+        self.calls += 1
+        if random.random() < self.slow_rate:
+            await asyncio.sleep(self.slow_ms / 1000)
+        return await super().generate_text(prompt)
+
+
+async def main(args) -> None:
+    random.seed(args.seed)
+    ai_orchestrator.AI_HEDGE_AFTER_SECONDS = args.hedge_ms / 1000
+    client = TailLatencyClient(args.latency_ms, args.slow_rate, args.slow_ms)
+    prompts = {name: f"Article {args.seed}\n\n{text}" for name, text in SOCIAL_PROMPTS.items()}
+    version = content_version(args.seed)
+
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        await asyncio.gather(*(client.generate_text(p) for p in prompts.values()))
+    gather_ms = (time.perf_counter() - started) * 1000 / args.rounds
+    print(f"asyncio.gather        {gather_ms:8.0f} ms/batch  {client.calls / args.rounds:.1f} calls")
+
+    hedged = calls = 0
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        generation_cache.clear()
+        client.calls = 0
+        result = await generate_batch(client, prompts, version)
+        hedged += result.hedged
+        calls += client.calls
+    cold_ms = (time.perf_counter() - started) * 1000 / args.rounds
+    print(f"orchestrator (cold)   {cold_ms:8.0f} ms/batch  {calls / args.rounds:.1f} calls, {hedged / args.rounds:.1f} hedged")
+
+    client.calls = 0
+    started = time.perf_counter()
+    result = await generate_batch(client, prompts, version)
+    warm_ms = (time.perf_counter() - started) * 1000
+    print(f"orchestrator (cached) {warm_ms:8.2f} ms/batch  {client.calls} calls, {result.cached} from cache")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    parser.add_argument("--slow-rate", type=float, default=0.2, help="fraction of calls hitting the slow tail")
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--hedge-ms", type=float, default=600, help="hedge delay for this run")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(main(parser.parse_args()))
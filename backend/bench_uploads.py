@@ -0,0 +1,104 @@
+"""
+Compare the /uploads mount (UploadsStaticFiles) with the plain StaticFiles
+it replaced, in-process through ASGI (no network, no server).
+
+    python bench_uploads.py --requests 2000 --concurrency 50
+
+Each scenario reports requests/s and bytes sent per request. The fixtures
+are written to a temporary directory: a PNG, a large SVG (with .br/.gz
+siblings for the new mount) and a content-addressed copy of the PNG.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.core.static_files import UploadsStaticFiles, precompress_file
+
+
+def make_fixtures(directory: str) -> None:
+    os.makedirs(os.path.join(directory, "cas", "ab", "cd"), exist_ok=True)
+    png = os.urandom(400 * 1024)
+    with open(os.path.join(directory, "photo.png"), "wb") as f:
+        f.write(png)
+    with open(os.path.join(directory, "cas", "ab", "cd", "abcd.png"), "wb") as f:
+        f.write(png)
+    paths = "".join(
+        f'<path d="M{i} {i} L{i * 2} {i * 3} C{i} {i + 5} {i + 9} {i} {i} {i}" fill="#{i % 256:02x}3366"/>'
+        for i in range(4000)
+    )
+    svg_path = os.path.join(directory, "logo.svg")
+    with open(svg_path, "w") as f:
+        f.write(f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1000 1000">{paths}</svg>')
+    precompress_file(svg_path)
+
+
+async def run_scenario(app, path: str, headers: dict, total: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Resolve validators once so conditional scenarios can reuse them
+        first = await client.get(path)
+        request_headers = {
+            key: first.headers.get("etag") if value == "{etag}" else value
+            for key, value in headers.items()
+        }
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(None)
+        sent = 0
+        statuses = set()
+
+        async def worker():
+            nonlocal sent
+            while not queue.empty():
+                queue.get_nowait()
+                # Raw bytes: count what went over the wire, skip client-side decoding
+                async with client.stream("GET", path, headers=request_headers) as response:
+                    statuses.add(response.status_code)
+                    async for chunk in response.aiter_raw():
+                        sent += len(chunk)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return total / elapsed, sent / total, sorted(statuses)
+
+
+SCENARIOS = [
+    ("png, full", "/uploads/photo.png", {}),
+    ("png, cas", "/uploads/cas/ab/cd/abcd.png", {}),
+    ("png, range 64k", "/uploads/photo.png", {"Range": "bytes=0-65535"}),
+    ("png, revalidate", "/uploads/photo.png", {"If-None-Match": "{etag}"}),
+    ("svg, identity", "/uploads/logo.svg", {"Accept-Encoding": "identity"}),
+    ("svg, gzip", "/uploads/logo.svg", {"Accept-Encoding": "gzip"}),
+    ("svg, br", "/uploads/logo.svg", {"Accept-Encoding": "br, gzip"}),
+]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        make_fixtures(directory)
+        apps = {
+            "StaticFiles": Starlette(routes=[Mount("/uploads", StaticFiles(directory=directory))]),
+            "UploadsStaticFiles": Starlette(routes=[Mount("/uploads", UploadsStaticFiles(directory=directory))]),
+        }
+        print(f"{'scenario':<18} {'mount':<19} {'req/s':>9} {'bytes/req':>11}  status")
+        for label, path, headers in SCENARIOS:
+            for name, app in apps.items():
+                rate, size, statuses = await run_scenario(app, path, headers, args.requests, args.concurrency)
+                print(f"{label:<18} {name:<19} {rate:>9.0f} {size:>11.0f}  {statuses}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""
+Export the public API as pre-compressed static JSON, one directory per route:
+
+    static_export/projects/slug/my-app/index.json(.gz, .br)
+    static_export/articles/page/2/index.json
+    static_export/public/bundle/index.json
+
+Any web server can then serve the site without Python, e.g. with nginx:
+``try_files $uri/index.json =404;`` plus ``gzip_static on; brotli_static on;``.
+
+By default only entities written since the last run are regenerated (change
+log filled by the ORM hook, plus rows whose created_at is newer than the
+last export). ``--full`` rebuilds everything and drops stale files.
+
+    python export_static.py
+    python export_static.py --full --out /var/www/api
+    python export_static.py --bench
+"""
+import argparse
+import tempfile
+import time
+
+from sqlmodel import Session, select
+
+from app.models.database import engine
+from app.models.portfolio import ContentChange, Project
+from app.services.export_service import DEFAULT_PAGE_SIZE, StaticExporter
+
+
+def _print_report(report, elapsed: float) -> None:
+    print(
+        f"{report.mode}: {report.written} written, {report.unchanged} unchanged, "
+        f"{report.removed} removed, {report.changes} changes in {elapsed * 1000:.0f} ms"
+    )
+
+
+def _timed(exporter: StaticExporter, full: bool):
+    started = time.perf_counter()
+    report = exporter.export_full() if full else exporter.export_incremental()
+    return report, time.perf_counter() - started
+
+
+def bench(page_size: int) -> None:
+    """Full regeneration vs incremental runs (nothing changed / one project changed)."""
+    with Session(engine) as session, tempfile.TemporaryDirectory() as out:
+        exporter = StaticExporter(session, out, page_size)
+        _print_report(*_timed(exporter, full=True))
+        _print_report(*_timed(exporter, full=True))
+        _print_report(*_timed(exporter, full=False))
+
+        project = session.exec(select(Project)).first()
+        if project is None:
+            print("No project in the database, skipping the one-change run")
+            return
+        change = ContentChange(entity="project", entity_id=str(project.id))
+        session.add(change)
+        session.commit()
+        try:
+            _print_report(*_timed(exporter, full=False))
+        finally:
+            session.delete(change)
+            session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="static_export", help="output directory")
+    parser.add_argument("--full", action="store_true", help="regenerate every file and drop stale ones")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="items per list page")
+    parser.add_argument("--bench", action="store_true", help="time full vs incremental export in a temp dir")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.page_size)
+        return
+
+    with Session(engine) as session:
+        _print_report(*_timed(StaticExporter(session, args.out, args.page_size), full=args.full))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Local stand-in for the OpenAI, Anthropic and Gemini HTTP APIs, streaming
+canned text token by token, to exercise the SSE endpoints without a key:
+
+    python fake_llm_server.py --port 8765 --ttft-ms 400 --token-ms 30
+    OPENAI_BASE_URL=http://127.0.0.1:8765 uvicorn app.main:app
+
+(with the AI_PROVIDER setting on OPENAI, CLAUDE or GEMINI and any AI_API_KEY).
+``--ttft-ms`` is the delay before the first token, ``--token-ms`` the gap
+between tokens; both streamed and plain requests are answered.
+"""
+import argparse
+import asyncio
+import json
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+TEXT = (
+    "Most agency websites lose their visitors in the first three seconds. "
+    "Here is how we rebuilt a client's landing page around a single promise, "
+    "cut its load time in half and doubled the number of qualified leads."
+)
+
+settings = {"ttft": 0.4, "token": 0.03}
+
+
+def _tokens():
+    words = TEXT.split(" ")
+    return [w if i == 0 else " " + w for i, w in enumerate(words)]
+
+
+async def _stream(frames):
+    await asyncio.sleep(settings["ttft"])
+    for i, frame in enumerate(frames):
+        if i:
+            await asyncio.sleep(settings["token"])
+        yield f"data: {json.dumps(frame) if not isinstance(frame, str) else frame}\n\n".encode()
+
+
+def _sse(frames):
+    return StreamingResponse(_stream(frames), media_type="text/event-stream")
+
+
+async def openai(request: Request):
+    body = await request.json()
+    if not body.get("stream"):
+        await asyncio.sleep(settings["ttft"] + settings["token"] * len(_tokens()))
+        return JSONResponse({"choices": [{"message": {"role": "assistant", "content": TEXT}}]})
+    frames = [{"choices": [{"delta": {"content": t}}]} for t in _tokens()]
+    return _sse([*frames, "[DONE]"])
+
+
+async def anthropic(request: Request):
+    body = await request.json()
+    if not body.get("stream"):
+        await asyncio.sleep(settings["ttft"] + settings["token"] * len(_tokens()))
+        return JSONResponse({"content": [{"type": "text", "text": TEXT}]})
+    frames = [{"type": "content_block_delta", "delta": {"type": "text_delta", "text": t}} for t in _tokens()]
+    return _sse([{"type": "message_start"}, *frames, {"type": "message_stop"}])
+
+
+async def gemini(request: Request):
+    method = request.path_params["method"]
+    frames = [{"candidates": [{"content": {"parts": [{"text": t}]}}]} for t in _tokens()]
+    if method.endswith(":streamGenerateContent"):
+        return _sse(frames)
+    await asyncio.sleep(settings["ttft"] + settings["token"] * len(_tokens()))
+    return JSONResponse({"candidates": [{"content": {"parts": [{"text": TEXT}]}}]})
+
+
+app = Starlette(routes=[
+    Route("/v1/chat/completions", openai, methods=["POST"]),
+    Route("/v1/messages", anthropic, methods=["POST"]),
+    Route("/v1beta/models/{method}", gemini, methods=["POST"]),
+])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft-ms", type=float, default=400)
+    parser.add_argument("--token-ms", type=float, default=30)
+    args = parser.parse_args()
+    settings.update(ttft=args.ttft_ms / 1000, token=args.token_ms / 1000)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
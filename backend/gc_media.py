@@ -0,0 +1,38 @@
+"""
+Delete content-addressed uploads that no project, article, testimonial or
+profile references anymore.
+
+    python gc_media.py --dry-run
+    python gc_media.py --grace-hours 48
+"""
+import argparse
+from datetime import timedelta
+
+from sqlmodel import Session
+
+from app.models.database import engine
+from app.services.media_service import collect_garbage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would be deleted, change nothing")
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=24,
+        help="keep unreferenced uploads younger than this (forms not saved yet)",
+    )
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        report = collect_garbage(session, timedelta(hours=args.grace_hours), dry_run=args.dry_run)
+
+    prefix = "[dry-run] " if args.dry_run else ""
+    print(f"{prefix}Scanned {report.scanned_assets} assets, {report.referenced_assets} referenced")
+    print(f"{prefix}Deleted {report.deleted_assets} assets and {report.deleted_orphan_files} orphan files")
+    print(f"{prefix}Freed {report.freed_bytes / 1024 / 1024:.2f} MB")
+
+
+if __name__ == "__main__":
+    main()